@@ -1,15 +1,45 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
-from typing import Dict, Optional
-
-from pathlib import Path
+from typing import Dict, List, Optional
 
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 
+from .credential_store import load_session_state, session_state_path
+from .debug_capture import capture_page, should_capture
+from .metrics import observe
+
 # NOTE: This is currently a STUB that pretends to run a Beacon / tax assessor lookup.
 # Later we can replace the internals with real Playwright-based automation.
 
+# Direct URL to the Beacon application for Lafayette Parish
+SEARCH_URL = (
+    "https://beacon.schneidercorp.com/Application.aspx"
+    "?AppID=966&LayerID=20531&PageTypeID=2&PageID=8141"
+)
+ADDRESS_INPUT = "#ctl00_ContentPlaceHolder1_txtAddress"
+SEARCH_BUTTON = "#ctl00_ContentPlaceHolder1_btnSearch"
+
+# Elements that identify which page a search landed on.
+DETAIL_MARKER = "#ctl00_ContentPlaceHolder1_lblOwner"
+RESULTS_LIST_MARKER = "#ctl00_ContentPlaceHolder1_gvwParcelResults"
+NO_RESULTS_MARKER = "#ctl00_ContentPlaceHolder1_lblNoResults"
+
+DETAIL_FIELDS = {
+    "owner": "ctl00_ContentPlaceHolder1_lblOwner",
+    "parcel_id": "ctl00_ContentPlaceHolder1_lblParcelNumber",
+    "acreage": "ctl00_ContentPlaceHolder1_lblAcreage",
+    "value": "ctl00_ContentPlaceHolder1_lblAssessedValue",
+}
+
+_READ_FIELDS_JS = """
+(ids) => Object.fromEntries(ids.map((id) => {
+  const el = document.getElementById(id);
+  return [id, el ? el.innerText.trim() : null];
+}))
+"""
+
 
 @dataclass
 class BeaconResult:
@@ -25,108 +55,113 @@ def run_beacon_lookup(
     address: Optional[str] = None,
     username: Optional[str] = None,
     password: Optional[str] = None,
-) -> Dict[str, str]:
+    run_id: Optional[str] = None,
+) -> Dict[str, object]:
   """Playwright-based scaffold for Beacon lookup.
 
   Behavior:
   - Launch Chromium using Playwright.
   - Open the Lafayette Parish Assessor Beacon search page.
-  - Fill the Address search box and click Search.
-  - If a detail page loads, scrape owner, parcel number, acreage, and assessed
-    value using the provided selectors.
-  - Capture a screenshot and HTML under ~/.local_rag_store/beacon_debug for
-    debugging.
+  - Fill the Address search box, click Search and wait for the detail,
+    results-list or no-results page, stopping early unless a detail page
+    loaded.
+  - On a detail page, read owner, parcel number, acreage, and assessed value
+    in a single DOM evaluation.
+  - Record per-phase timings (ms) under ``timings_ms``.
+  - Depending on ``settings.debug_capture_mode``, queue a screenshot and
+    gzipped HTML under ~/.local_rag_store/beacon_debug for debugging.
   """
 
-  debug_dir = Path.home() / ".local_rag_store" / "beacon_debug"
-  debug_dir.mkdir(parents=True, exist_ok=True)
 
   owner = parcel_id = acreage = value = None
+  artifacts: List[str] = []
+  outcome = "error"
+  timings: Dict[str, int] = {}
+  phase_start = time.perf_counter()
+
+  def _mark(phase: str) -> None:
+      nonlocal phase_start
+      now = time.perf_counter()
+      timings[phase] = int((now - phase_start) * 1000)
+      observe(phase, now - phase_start, component="beacon")
+      phase_start = now
 
   try:
       with sync_playwright() as p:
           browser = p.chromium.launch(headless=False)
-          context = browser.new_context()
+          # Reuse the saved session (login cookies, accepted terms) so
+          # repeated lookups skip the login / agreement flow.
+          context = browser.new_context(storage_state=load_session_state("beacon"))
           page = context.new_page()
+          _mark("launch")
 
-          # Direct URL to the Beacon application for Lafayette Parish
-          search_url = (
-              "https://beacon.schneidercorp.com/Application.aspx"
-              "?AppID=966&LayerID=20531&PageTypeID=2&PageID=8141"
-          )
-          page.goto(search_url, wait_until="load", timeout=60000)
+          page.goto(SEARCH_URL, wait_until="domcontentloaded", timeout=60000)
+          _mark("navigate")
 
-          # Accept terms dialog if present
+          # Accept terms dialog if present. It renders with the page, so a
+          # short wait is enough to tell whether it exists at all.
           try:
-              page.get_by_role("button", name="Agree").click(timeout=5000)
+              page.get_by_role("button", name="Agree").click(timeout=1500)
           except PlaywrightTimeoutError:
               pass
           except Exception:
               pass
 
-          # Fill the Address search box
+          # Fill the Address search box and wait for whichever page the search
+          # lands on: detail, results list, or "no results".
           search_text = address or property_label
           try:
-              page.fill("#ctl00_ContentPlaceHolder1_txtAddress", search_text)
-              page.click("#ctl00_ContentPlaceHolder1_btnSearch")
-          except PlaywrightTimeoutError:
-              pass
-          except Exception:
-              pass
-
-          # Give the site some time to navigate / load details
-          try:
-              page.wait_for_timeout(3000)
-          except Exception:
-              pass
-
-          # Try to read detail labels. If the search produced a list instead of
-          # a detail page, these selectors may fail; we simply fall back.
-          try:
-              owner = page.locator("#ctl00_ContentPlaceHolder1_lblOwner").inner_text(timeout=5000)
-          except PlaywrightTimeoutError:
-              owner = None
-          except Exception:
-              owner = None
-
-          try:
-              parcel_id = page.locator("#ctl00_ContentPlaceHolder1_lblParcelNumber").inner_text(timeout=2000)
-          except PlaywrightTimeoutError:
-              parcel_id = None
-          except Exception:
-              parcel_id = None
-
-          try:
-              acreage = page.locator("#ctl00_ContentPlaceHolder1_lblAcreage").inner_text(timeout=2000)
+              page.fill(ADDRESS_INPUT, search_text, timeout=10000)
+              page.click(SEARCH_BUTTON)
+              page.wait_for_selector(
+                  ", ".join([DETAIL_MARKER, RESULTS_LIST_MARKER, NO_RESULTS_MARKER]),
+                  state="attached",
+                  timeout=20000,
+              )
+              if page.locator(DETAIL_MARKER).count():
+                  outcome = "detail"
+              elif page.locator(RESULTS_LIST_MARKER).count():
+                  outcome = "results_list"
+              else:
+                  outcome = "no_results"
           except PlaywrightTimeoutError:
-              acreage = None
+              outcome = "timeout"
           except Exception:
-              acreage = None
-
-          try:
-              value = page.locator("#ctl00_ContentPlaceHolder1_lblAssessedValue").inner_text(timeout=2000)
-          except PlaywrightTimeoutError:
-              value = None
-          except Exception:
-              value = None
-
-          # Save debug artifacts for the current view
-          safe_label = "_".join(property_label.split())[:40]
-          screenshot_path = debug_dir / f"beacon_{safe_label}.png"
-          html_path = debug_dir / f"beacon_{safe_label}.html"
-
-          try:
-              page.screenshot(path=str(screenshot_path), full_page=True)
-              html_path.write_text(page.content(), encoding="utf-8")
-          except Exception:
-              pass
+              outcome = "error"
+          _mark("search")
+
+          # Read every detail label in a single DOM round-trip.
+          if outcome == "detail":
+              try:
+                  fields = page.evaluate(_READ_FIELDS_JS, list(DETAIL_FIELDS.values()))
+              except Exception:
+                  fields = {}
+              owner = fields.get(DETAIL_FIELDS["owner"])
+              parcel_id = fields.get(DETAIL_FIELDS["parcel_id"])
+              acreage = fields.get(DETAIL_FIELDS["acreage"])
+              value = fields.get(DETAIL_FIELDS["value"])
+              _mark("extract")
+
+          # Debug artifacts are written by a background worker; by default
+          # only failed lookups are captured.
+          if should_capture(outcome == "detail" and bool(owner)):
+              artifacts = capture_page(page, "beacon", property_label, run_id=run_id)
+              _mark("debug_capture")
+
+          if outcome != "error":
+              try:
+                  context.storage_state(path=str(session_state_path("beacon")))
+              except Exception:
+                  pass
 
           browser.close()
   except Exception:
       # If anything above fails, we just fall back to placeholder notes below.
       pass
 
-  base_notes = "Beacon automation ran. Screenshot and HTML saved for analysis."
+  base_notes = f"Beacon automation ran ({outcome.replace('_', ' ')})."
+  if artifacts:
+      base_notes += " Screenshot and HTML saved for analysis."
   if address:
       base_notes += f" Property: {address}."
 
@@ -143,4 +178,7 @@ def run_beacon_lookup(
       "acreage": result.acreage or "",
       "value": result.value or "",
       "notes": result.notes or "",
+      "outcome": outcome,
+      "timings_ms": timings,
+      "debug_artifacts": artifacts,
   }
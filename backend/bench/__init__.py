@@ -0,0 +1,4 @@
+"""Offline benchmarks for indexing and querying.
+
+Run ``python -m backend.bench.run_bench --help`` from the repository root.
+"""
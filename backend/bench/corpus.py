@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+from typing import Dict
+
+
+# Number of files of each kind generated per corpus size.
+SIZES: Dict[str, Dict[str, int]] = {
+    "small": {"text": 50, "code": 25, "pdf": 5, "docx": 5},
+    "medium": {"text": 500, "code": 250, "pdf": 40, "docx": 40},
+    "large": {"text": 5000, "code": 2500, "pdf": 300, "docx": 300},
+}
+
+_WORDS = (
+    "bid estimate parcel assessor foundation slab rebar concrete framing roof "
+    "drainage permit zoning setback easement survey contractor invoice change "
+    "order schedule inspection site plan elevation grading utility water sewer "
+    "electrical panel hvac duct insulation drywall finish warranty lien owner"
+).split()
+
+
+def _paragraph(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _text_file(rng: random.Random) -> str:
+    return "\n\n".join(_paragraph(rng, rng.randint(40, 120)) for _ in range(rng.randint(3, 30)))
+
+
+def _code_file(rng: random.Random) -> str:
+    funcs = []
+    for i in range(rng.randint(3, 20)):
+        name = f"{rng.choice(_WORDS)}_{rng.choice(_WORDS)}_{i}"
+        body = "\n".join(f"    {rng.choice(_WORDS)} = {rng.randint(0, 1000)}" for _ in range(rng.randint(2, 12)))
+        funcs.append(f"def {name}():\n    \"\"\"{_paragraph(rng, 12)}\"\"\"\n{body}\n    return None\n")
+    return "\n\n".join(funcs)
+
+
+def _escape_pdf(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _write_pdf(path: Path, rng: random.Random, pages: int) -> None:
+    """Write a minimal multi-page PDF with plain Helvetica text.
+
+    Hand-rolled so the generator does not need a PDF writing library.
+    """
+
+    objects: list[bytes] = []
+    page_ids = [3 + 2 * i for i in range(pages)]
+    font_id = 3 + 2 * pages
+
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode())
+    for pid in page_ids:
+        lines = [_paragraph(rng, 10) for _ in range(40)]
+        stream = "BT /F1 10 Tf 12 TL 40 760 Td " + " ".join(f"({_escape_pdf(l)}) '" for l in lines) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {pid + 1} 0 R >>".encode()
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref_at = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode()
+    path.write_bytes(bytes(out))
+
+
+def _write_docx(path: Path, rng: random.Random) -> None:
+    import docx
+
+    document = docx.Document()
+    for _ in range(rng.randint(10, 80)):
+        document.add_paragraph(_paragraph(rng, rng.randint(20, 80)))
+    document.save(str(path))
+
+
+def generate_corpus(root: Path, size: str = "small", seed: int = 0) -> Dict[str, int]:
+    """Generate a synthetic corpus under ``root`` and return per-kind counts.
+
+    The same ``size`` and ``seed`` always produce the same files, so runs
+    are comparable across commits.
+    """
+
+    counts = SIZES[size]
+    rng = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+
+    for i in range(counts["text"]):
+        sub = root / "notes" / f"d{i % 20}"
+        sub.mkdir(parents=True, exist_ok=True)
+        suffix = rng.choice([".txt", ".md", ".json"])
+        (sub / f"note_{i}{suffix}").write_text(_text_file(rng), encoding="utf-8")
+
+    for i in range(counts["code"]):
+        sub = root / "src" / f"pkg{i % 10}"
+        sub.mkdir(parents=True, exist_ok=True)
+        (sub / f"module_{i}.py").write_text(_code_file(rng), encoding="utf-8")
+
+    pdf_dir = root / "plans"
+    pdf_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(counts["pdf"]):
+        _write_pdf(pdf_dir / f"plan_{i}.pdf", rng, pages=rng.randint(2, 20))
+
+    if counts["docx"]:
+        docx_dir = root / "bids"
+        docx_dir.mkdir(parents=True, exist_ok=True)
+        for i in range(counts["docx"]):
+            _write_docx(docx_dir / f"bid_{i}.docx", rng)
+
+    return dict(counts)
@@ -0,0 +1,116 @@
+"""Recall / footprint comparison for shortened and quantized vectors.
+
+Indexes one synthetic corpus several times -- once at full precision as the
+reference, then once per ``--dims`` x ``--precision`` combination -- and runs
+a held-out query set against each. Reports recall@k against the reference,
+retrieval latency and on-disk size::
+
+    python -m backend.bench.recall --size small --full-dim 3072 --dims 256,512 --precision none,int8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..config import settings
+from ..rag import LocalRAGEngine
+from .corpus import _paragraph, generate_corpus
+from .run_bench import percentile
+from .stub_openai import StubOpenAIServer
+
+
+def _dir_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def held_out_queries(n: int, seed: int) -> List[str]:
+    # A seed disjoint from the corpus seed, so queries are not verbatim chunks.
+    rng = random.Random(10_000 + seed)
+    return [_paragraph(rng, rng.randint(4, 12)) for _ in range(n)]
+
+
+def _run_config(
+    name: str,
+    tmp: Path,
+    corpus_dir: Path,
+    base_url: str,
+    queries: List[str],
+    top_k: int,
+    rerank_k: int,
+    dims: Optional[int],
+    precision: Optional[str],
+) -> Dict[str, object]:
+    storage = tmp / name
+    engine = LocalRAGEngine(
+        storage_dir=storage,
+        openai_api_key="bench",
+        openai_base_url=base_url,
+        embedding_dimensions=dims,
+        rescore_precision=precision,
+    )
+    include_globs = settings.default_include_globs + ["**/*.pdf", "**/*.docx"]
+    engine.index_paths([corpus_dir], include_globs=include_globs)
+
+    results: List[List[str]] = []
+    latencies: List[float] = []
+    for q in queries:
+        start = time.perf_counter()
+        hits = engine.retrieve(q, top_k=top_k, rerank_k=rerank_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append([hit["chunk_id"] for hit in hits])
+
+    return {
+        "name": name,
+        "dims": dims,
+        "rescore_precision": precision,
+        "chroma_bytes": _dir_size(storage / "chroma"),
+        "rescore_bytes": _dir_size(storage / "vectors") if (storage / "vectors").exists() else 0,
+        "retrieve_ms": {"p50": round(percentile(latencies, 50), 2), "p95": round(percentile(latencies, 95), 2)},
+        "_ids": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--full-dim", type=int, default=3072, help="Native dimension returned by the stub")
+    parser.add_argument("--dims", default="256,512", help="Comma-separated index dimensions to evaluate")
+    parser.add_argument("--precision", default="none,int8", help="Comma-separated rescore precisions (none, float32, float16, int8)")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--rerank-k", type=int, default=40)
+    args = parser.parse_args(argv)
+
+    queries = held_out_queries(args.queries, args.seed)
+    with tempfile.TemporaryDirectory(prefix="rag-recall-") as tmp_name, StubOpenAIServer(dim=args.full_dim) as stub:
+        tmp = Path(tmp_name)
+        corpus_dir = tmp / "corpus"
+        generate_corpus(corpus_dir, size=args.size, seed=args.seed)
+
+        common = dict(tmp=tmp, corpus_dir=corpus_dir, base_url=stub.base_url, queries=queries, top_k=args.top_k, rerank_k=args.rerank_k)
+        reference = _run_config("reference", dims=None, precision=None, **common)
+
+        rows = [reference]
+        for dims in [int(d) for d in args.dims.split(",") if d]:
+            for precision in args.precision.split(","):
+                precision = None if precision in ("", "none") else precision
+                name = f"d{dims}-{precision or 'ann-only'}"
+                rows.append(_run_config(name, dims=dims, precision=precision, **common))
+
+    reference_ids = reference["_ids"]
+    for row in rows:
+        overlaps = [len(set(ids) & set(ref)) / max(1, len(ref)) for ids, ref in zip(row.pop("_ids"), reference_ids)]
+        row["recall_at_k"] = round(sum(overlaps) / len(overlaps), 4) if overlaps else 1.0
+    print(json.dumps(rows, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,180 @@
+"""Offline indexing / query benchmark.
+
+Generates a synthetic corpus, indexes it with ``LocalRAGEngine`` against the
+stub OpenAI server and reports throughput, peak RSS and query latency
+percentiles. Results are written as JSON so they can be kept as baselines
+and compared on later runs::
+
+    python -m backend.bench.run_bench --sizes small,medium --save
+    python -m backend.bench.run_bench --sizes small --compare backend/bench/baselines/small.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..config import settings
+from ..rag import LocalRAGEngine
+from .corpus import SIZES, generate_corpus
+from .stub_openai import StubOpenAIServer
+
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+QUERIES = [
+    "What does the bid say about concrete slab thickness?",
+    "Who is the owner listed on the survey?",
+    "Summarize the drainage and grading requirements.",
+    "Which permits are needed for the electrical panel?",
+    "What is the schedule for the roof inspection?",
+    "Are there any easements or setback issues on the site plan?",
+    "List the change orders related to framing.",
+    "What warranty terms apply to the hvac work?",
+]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak RSS of this process. The OS only ever raises it, which is why
+    each corpus size is benchmarked in a fresh process."""
+
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes.
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return peak / divisor
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def run_size(size: str, args: argparse.Namespace) -> Dict[str, object]:
+    with tempfile.TemporaryDirectory(prefix=f"rag-bench-{size}-") as tmp:
+        tmp_path = Path(tmp)
+        corpus_dir = tmp_path / "corpus"
+        generate_corpus(corpus_dir, size=size, seed=args.seed)
+
+        stub = StubOpenAIServer(
+            dim=args.dim,
+            embed_latency_ms=args.embed_latency_ms,
+            chat_latency_ms=args.chat_latency_ms,
+            requests_per_second=args.rate_limit,
+        )
+        with stub:
+            engine = LocalRAGEngine(
+                storage_dir=tmp_path / "store",
+                openai_api_key="bench",
+                openai_base_url=stub.base_url,
+            )
+            include_globs = settings.default_include_globs + ["**/*.pdf", "**/*.docx"]
+            files = list(engine._iter_files([corpus_dir], include_globs, settings.default_exclude_globs))
+
+            start = time.perf_counter()
+            chunks = engine.index_paths([corpus_dir], include_globs=include_globs)
+            index_seconds = time.perf_counter() - start
+
+            latencies: List[float] = []
+            for i in range(args.queries):
+                q_start = time.perf_counter()
+                engine.query(QUERIES[i % len(QUERIES)], top_k=8)
+                latencies.append((time.perf_counter() - q_start) * 1000)
+
+            stub_stats = dict(stub.stats)
+
+    return {
+        "size": size,
+        "files": len(files),
+        "chunks": chunks,
+        "index_seconds": round(index_seconds, 3),
+        "files_per_sec": round(len(files) / index_seconds, 2) if index_seconds else None,
+        "chunks_per_sec": round(chunks / index_seconds, 2) if index_seconds else None,
+        "peak_rss_mb": round(peak_rss_mb() or 0.0, 1),
+        "query_latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+        },
+        "stub": stub_stats,
+    }
+
+
+def _compare(current: Dict[str, object], baseline: Dict[str, object]) -> List[str]:
+    lines = []
+    for key in ("files_per_sec", "chunks_per_sec", "peak_rss_mb"):
+        old, new = baseline.get(key), current.get(key)
+        if old and new:
+            lines.append(f"  {key:<16} {old:>10} -> {new:>10} ({(new - old) / old:+.1%})")
+    for key in ("p50", "p95", "p99"):
+        old = baseline.get("query_latency_ms", {}).get(key)
+        new = current.get("query_latency_ms", {}).get(key)
+        if old and new:
+            lines.append(f"  query {key:<10} {old:>10} -> {new:>10} ({(new - old) / old:+.1%})")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="small", help=f"Comma-separated corpus sizes ({', '.join(SIZES)})")
+    parser.add_argument("--queries", type=int, default=50, help="Number of queries to time")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dim", type=int, default=256, help="Embedding dimension returned by the stub")
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0)
+    parser.add_argument("--chat-latency-ms", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None, help="Stub requests/sec before answering 429")
+    parser.add_argument("--save", action="store_true", help=f"Write results to {BASELINE_DIR}/<size>.json")
+    parser.add_argument("--compare", type=Path, action="append", default=[], help="Baseline JSON to compare against")
+    args = parser.parse_args(argv)
+
+    baselines = {}
+    for path in args.compare:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        baselines[data["size"]] = data
+
+    for size in args.sizes.split(","):
+        size = size.strip()
+        # A fresh interpreter per size, so peak RSS is not inherited from the
+        # sizes that ran before it.
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            result = pool.submit(run_size, size, args).result()
+        result["recorded_at"] = datetime.utcnow().isoformat()
+        result["python"] = platform.python_version()
+        result["platform"] = platform.platform()
+        print(json.dumps(result, indent=2))
+
+        if size in baselines:
+            print(f"Compared with baseline ({baselines[size].get('recorded_at')}):")
+            print("\n".join(_compare(result, baselines[size])))
+
+        if args.save:
+            BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+            (BASELINE_DIR / f"{size}.json").write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
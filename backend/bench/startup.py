@@ -0,0 +1,118 @@
+"""Import-time profile and time-to-/health benchmark for the backend.
+
+Guards cold start: fails (exit code 1) if importing ``backend.main`` pulls in
+any of the heavy dependencies that should load on first use, or if the
+server takes longer than ``--max-health-ms`` to answer ``/health``::
+
+    python -m backend.bench.startup --top 15 --max-health-ms 3000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from typing import List, Optional
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Must not be imported until a feature that needs them is used.
+LAZY_MODULES = ["chromadb", "numpy", "playwright", "pypdf", "docx", "watchdog", "fastembed"]
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_profile(top: int) -> dict:
+    """Run ``python -X importtime`` on backend.main and summarize it."""
+
+    check = "import sys, json, backend.main; print(json.dumps(sorted(m for m in %r if m in sys.modules)))" % (LAZY_MODULES,)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", check],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = int(match[1]), int(match[2]), match[3], match[4]
+        if len(indent) == 1:  # top-level imports of the -c snippet
+            total_us += cumulative_us
+        rows.append((cumulative_us, self_us, module))
+    rows.sort(reverse=True)
+    return {
+        "total_import_ms": round(total_us / 1000, 1),
+        "top_cumulative_ms": [
+            {"module": module, "cumulative_ms": round(cum / 1000, 1), "self_ms": round(own / 1000, 1)}
+            for cum, own, module in rows[:top]
+        ],
+        "heavy_modules_loaded": json.loads(proc.stdout.strip().splitlines()[-1]),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_health(timeout: float = 60.0) -> float:
+    """Start uvicorn and return milliseconds until /health answers 200."""
+
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as resp:
+                    if resp.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError("backend did not answer /health in time")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list")
+    parser.add_argument("--runs", type=int, default=3, help="Server start runs to time")
+    parser.add_argument("--max-health-ms", type=float, default=None, help="Fail if median time-to-/health exceeds this")
+    args = parser.parse_args(argv)
+
+    report = import_profile(args.top)
+    runs = sorted(time_to_health() for _ in range(args.runs))
+    report["time_to_health_ms"] = {"median": round(runs[len(runs) // 2], 1), "runs": [round(r, 1) for r in runs]}
+    print(json.dumps(report, indent=2))
+
+    failed = False
+    if report["heavy_modules_loaded"]:
+        print(f"FAIL: backend.main imports {', '.join(report['heavy_modules_loaded'])} at startup", file=sys.stderr)
+        failed = True
+    if args.max_health_ms is not None and report["time_to_health_ms"]["median"] > args.max_health_ms:
+        print(f"FAIL: time to /health {report['time_to_health_ms']['median']} ms > {args.max_health_ms} ms", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+import numpy as np
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+@lru_cache(maxsize=50_000)
+def _token_vector(token: str, dim: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha256(token.encode("utf-8")).digest()[:8], "little")
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+
+def fake_embedding(text: str, dim: int, dimensions: Optional[int] = None) -> List[float]:
+    """Deterministic bag-of-words random projection.
+
+    Texts sharing words get similar vectors, so retrieval quality is
+    meaningful, and any prefix of the vector is itself a random projection,
+    so shortened vectors behave like text-embedding-3's ``dimensions``.
+    """
+
+    vec = np.zeros(dim, dtype=np.float32)
+    for token in _TOKEN_RE.findall(text.lower()):
+        vec += _token_vector(token, dim)
+    if dimensions:
+        vec = vec[:dimensions]
+    norm = float(np.linalg.norm(vec))
+    if norm == 0:
+        vec[0] = 1.0
+        norm = 1.0
+    return (vec / norm).tolist()
+
+
+class _RateLimiter:
+    def __init__(self, per_second: Optional[float]) -> None:
+        self.per_second = per_second
+        self._lock = threading.Lock()
+        self._tokens = per_second or 0.0
+        self._last = time.monotonic()
+
+    def allow(self) -> bool:
+        if not self.per_second:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.per_second, self._tokens + (now - self._last) * self.per_second)
+            self._last = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class StubOpenAIServer:
+    """Local stand-in for the ``/embeddings`` and ``/chat/completions``
+    endpoints used by ``OpenAIHttpClient``.
+
+    ``embed_latency_ms`` / ``chat_latency_ms`` are added to every response,
+    and ``requests_per_second`` turns on a token-bucket limit that answers
+    429 like the real API.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        dim: int = 256,
+        embed_latency_ms: float = 0.0,
+        chat_latency_ms: float = 0.0,
+        requests_per_second: Optional[float] = None,
+    ) -> None:
+        self.dim = dim
+        self.embed_latency_ms = embed_latency_ms
+        self.chat_latency_ms = chat_latency_ms
+        self.limiter = _RateLimiter(requests_per_second)
+        self.stats = {"embedding_requests": 0, "embedded_inputs": 0, "chat_requests": 0, "rate_limited": 0}
+        # Handlers run on ThreadingHTTPServer threads.
+        self._stats_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args) -> None:  # silence per-request logging
+                pass
+
+            def _send(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if status == 429:
+                    self.send_header("Retry-After", "0.2")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+
+                if not server.limiter.allow():
+                    server.count(rate_limited=1)
+                    self._send(429, {"error": {"message": "Rate limit reached"}})
+                    return
+
+                if self.path.endswith("/embeddings"):
+                    inputs = request.get("input") or []
+                    if isinstance(inputs, str):
+                        inputs = [inputs]
+                    dimensions = request.get("dimensions")
+                    time.sleep(server.embed_latency_ms / 1000)
+                    server.count(embedding_requests=1, embedded_inputs=len(inputs))
+                    data = [
+                        {"object": "embedding", "index": i, "embedding": fake_embedding(text, server.dim, dimensions)}
+                        for i, text in enumerate(inputs)
+                    ]
+                    self._send(200, {"object": "list", "data": data, "model": request.get("model")})
+                    return
+
+                if self.path.endswith("/chat/completions"):
+                    time.sleep(server.chat_latency_ms / 1000)
+                    server.count(chat_requests=1)
+                    prompt_chars = sum(len(m.get("content", "")) for m in request.get("messages", []))
+                    content = f"Stub answer ({prompt_chars} prompt chars)."
+                    self._send(200, {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]})
+                    return
+
+                self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+        return Handler
+
+    def count(self, **increments: int) -> None:
+        with self._stats_lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def start(self) -> "StubOpenAIServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "StubOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
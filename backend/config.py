@@ -1,5 +1,6 @@
 from pathlib import Path
 from pydantic import BaseModel
+from typing import Optional
 import os
 
 
@@ -15,6 +16,8 @@ class Settings(BaseModel):
         "**/*.json",
         "**/*.yaml",
         "**/*.yml",
+        "**/*.xlsx",
+        "**/*.pptx",
     ]
     default_exclude_globs: list[str] = [
         "**/.git/**",
@@ -25,6 +28,56 @@ class Settings(BaseModel):
         "**/__pycache__/**",
     ]
     max_file_size_mb: int = 25
+    # "openai" calls the embeddings API; "local" runs a CPU model in-process
+    # (needs the optional fastembed package). Each backend/model gets its own
+    # collection.
+    embedding_backend: str = os.environ.get("RAG_EMBEDDING_BACKEND", "openai")
+    openai_embedding_model: str = "text-embedding-3-large"
+    local_embedding_model: str = "BAAI/bge-small-en-v1.5"
+    local_embedding_threads: int = min(8, os.cpu_count() or 1)
+    local_embedding_batch_size: int = 64
+    # Shorten embeddings to this many dimensions in the ANN index (None keeps
+    # the model's native size). With rescore_precision set ("float32",
+    # "float16" or "int8"), full vectors are also kept at that precision and
+    # used to re-rank the final candidates.
+    embedding_dimensions: Optional[int] = None
+    rescore_precision: Optional[str] = None
+    # Point at a compatible server (e.g. the benchmark stub) instead of OpenAI.
+    openai_base_url: str = os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1")
+    # How long a scraped Beacon / SOS lookup stays valid before the live site
+    # is queried again. Assessor and SOS records change rarely.
+    lookup_cache_ttl_hours: dict[str, float] = {
+        "beacon": 24 * 7,
+        "sos": 24,
+    }
+    # Watch mode: quiet period before a batch of file changes is indexed, and
+    # scan interval when watchdog is unavailable and we fall back to polling.
+    watch_debounce_seconds: float = 2.0
+    watch_poll_interval_seconds: float = 5.0
+    # Server-side chat sessions: turns kept verbatim, how many unsummarized
+    # turns trigger compaction into the running summary, and, per embedding
+    # model, the cosine similarity above which the previous turn's chunks are
+    # reused instead of searching the index again. Similarities are not
+    # comparable across models (bge scores cluster in roughly [0.6, 1]);
+    # models without an entry never reuse. Reuse stops after
+    # chat_max_reuse_streak answers in a row so the index is searched again.
+    chat_recent_turns: int = 4
+    chat_compact_after: int = 8
+    chat_reuse_similarity: dict[str, float] = {
+        "openai:text-embedding-3-large": 0.5,
+        "local:BAAI/bge-small-en-v1.5": 0.8,
+    }
+    chat_max_reuse_streak: int = 2
+    # Cached text extracted from PDF/DOCX/XLSX/PPTX files; entries unused for
+    # longer than the age limit, then the least recently used ones beyond the
+    # size quota, are pruned.
+    extract_cache_max_mb: int = 1024
+    extract_cache_max_age_days: int = 90
+    # Debug screenshots / HTML from the Playwright agents: "off", "on_failure"
+    # or "always". Artifacts are pruned to stay within the size and age quota.
+    debug_capture_mode: str = "on_failure"
+    debug_capture_max_mb: int = 200
+    debug_capture_max_age_days: int = 14
 
 
 settings = Settings()
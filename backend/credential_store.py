@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from .config import settings
+from .utils import FileLock
+
+
+class CredentialStore:
+    """In-memory view of ``credentials.json``.
+
+    The parsed file is cached and only re-read when its mtime changes, so
+    per-step lookups no longer hit the disk. Writes go through a file lock and
+    an atomic replace.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Dict[str, str]] = {}
+        self._mtime: Optional[float] = None
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return None
+
+    def load(self) -> Dict[str, Dict[str, str]]:
+        with self._lock:
+            mtime = self._current_mtime()
+            if mtime != self._mtime:
+                self._cache = self._read() if mtime is not None else {}
+                self._mtime = mtime
+            return dict(self._cache)
+
+    def _read(self) -> Dict[str, Dict[str, str]]:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception:
+            return {}
+
+    def get(self, site: str) -> Optional[Dict[str, str]]:
+        return self.load().get(site)
+
+    def set(self, site: str, username: str, password: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, FileLock(self.path.with_suffix(".lock")):
+            # Re-read under the lock so concurrent writers don't drop entries.
+            data = self._read() if self.path.exists() else {}
+            previous = data.get(site)
+            data[site] = {"username": username, "password": password}
+
+            tmp = self.path.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+            self._cache = data
+            self._mtime = self._current_mtime()
+
+        # A saved browser session belongs to the old login.
+        if previous != data[site]:
+            clear_session_state(site)
+
+
+def session_state_path(site: str) -> Path:
+    """Where the Playwright storage state (cookies, local storage) for a
+    site's logged-in session is persisted between lookups."""
+
+    base = settings.storage_dir / "sessions"
+    base.mkdir(parents=True, exist_ok=True)
+    return base / f"{site}.json"
+
+
+def load_session_state(site: str) -> Optional[str]:
+    path = session_state_path(site)
+    return str(path) if path.exists() else None
+
+
+def clear_session_state(site: str) -> None:
+    session_state_path(site).unlink(missing_ok=True)
+
+
+credential_store = CredentialStore(settings.storage_dir / "credentials.json")
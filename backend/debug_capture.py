@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import gzip
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from .config import settings
+
+
+# A single background worker keeps writes off the scraping thread and
+# serializes pruning of the debug directories.
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="debug-capture")
+
+
+def should_capture(success: bool) -> bool:
+    mode = settings.debug_capture_mode
+    if mode == "always":
+        return True
+    if mode == "on_failure":
+        return not success
+    return False
+
+
+def _debug_dir(kind: str) -> Path:
+    base = settings.storage_dir / f"{kind}_debug"
+    base.mkdir(parents=True, exist_ok=True)
+    return base
+
+
+def _artifact_stem(kind: str, label: str, run_id: Optional[str]) -> str:
+    safe_label = "".join(c if c.isalnum() else "_" for c in label)[:40]
+    stamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    scope = run_id or uuid.uuid4().hex[:8]
+    return f"{kind}_{stamp}_{scope}_{uuid.uuid4().hex[:6]}_{safe_label}"
+
+
+def capture_page(page, kind: str, label: str, run_id: Optional[str] = None) -> List[str]:
+    """Grab a screenshot and the page HTML and hand them to the background
+    writer.
+
+    Only the in-browser work (screenshot bytes, page content) happens on the
+    caller's thread. Returns the paths the artifacts will be written to.
+    """
+
+    try:
+        screenshot = page.screenshot(full_page=True)
+        html = page.content()
+    except Exception:
+        return []
+
+    debug_dir = _debug_dir(kind)
+    stem = _artifact_stem(kind, label, run_id)
+    screenshot_path = debug_dir / f"{stem}.png"
+    html_path = debug_dir / f"{stem}.html.gz"
+    _writer.submit(_write_artifacts, debug_dir, screenshot_path, screenshot, html_path, html)
+    return [str(screenshot_path), str(html_path)]
+
+
+def _write_artifacts(debug_dir: Path, screenshot_path: Path, screenshot: bytes, html_path: Path, html: str) -> None:
+    try:
+        screenshot_path.write_bytes(screenshot)
+        with gzip.open(html_path, "wt", encoding="utf-8") as f:
+            f.write(html)
+    except Exception:
+        pass
+    _prune(debug_dir)
+
+
+def _prune(debug_dir: Path) -> None:
+    """Drop artifacts older than the age limit, then the oldest remaining
+    ones until the directory fits within the size quota."""
+
+    max_age = settings.debug_capture_max_age_days * 86400
+    max_bytes = settings.debug_capture_max_mb * 1024 * 1024
+    now = time.time()
+
+    files = []
+    for path in debug_dir.iterdir():
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        if not path.is_file():
+            continue
+        if now - stat.st_mtime > max_age:
+            path.unlink(missing_ok=True)
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
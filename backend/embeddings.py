@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+
+class EmbeddingProvider(ABC):
+    """Interface for embedding backends.
+
+    Instances are Chroma-compatible embedding functions. ``name`` identifies
+    the vector space (backend + model) and is stored in the collection
+    metadata, so vectors from different providers never share a collection.
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    def __call__(self, input: List[str]) -> List[List[float]]:  # chroma expects a callable(input=[...])
+        ...
+
+    def embed_query(self, input: List[str]) -> List[List[float]]:
+        """Embed search queries. Models with asymmetric query/document
+        encodings override this."""
+
+        return self(input)
+
+
+class LocalEmbeddingFn(EmbeddingProvider):
+    """CPU-only embeddings computed in-process with fastembed (ONNX runtime).
+
+    Needs the optional ``fastembed`` package; the model is downloaded on first
+    use and cached locally afterwards, so indexing works offline. Large inputs
+    are split into batches that run in parallel threads (ONNX releases the
+    GIL during inference).
+    """
+
+    def __init__(self, model_name: str = "BAAI/bge-small-en-v1.5", threads: int = 4, batch_size: int = 64, cache_dir: Optional[str] = None) -> None:
+        self._model_name = model_name
+        self._threads = max(1, threads)
+        self._batch_size = batch_size
+        self._cache_dir = cache_dir
+        self._model = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.name = f"local:{model_name}"
+
+    def _load(self):
+        with self._lock:
+            if self._model is None:
+                try:
+                    from fastembed import TextEmbedding
+                except ImportError as exc:
+                    raise RuntimeError(
+                        "The local embedding backend needs the 'fastembed' package: pip install fastembed"
+                    ) from exc
+                # One intra-op thread per session; parallelism comes from the
+                # batch thread pool instead, which avoids oversubscription.
+                self._model = TextEmbedding(self._model_name, cache_dir=self._cache_dir, threads=1)
+                self._pool = ThreadPoolExecutor(max_workers=self._threads, thread_name_prefix="local-embed")
+        return self._model
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        return [vec.tolist() for vec in self._model.embed(texts, batch_size=self._batch_size)]
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        if not input:
+            return []
+        self._load()
+        batches = [input[i:i + self._batch_size] for i in range(0, len(input), self._batch_size)]
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+        results: List[List[float]] = []
+        for batch_vectors in self._pool.map(self._embed_batch, batches):
+            results.extend(batch_vectors)
+        return results
+
+    def embed_query(self, input: List[str]) -> List[List[float]]:
+        if not input:
+            return []
+        model = self._load()
+        return [vec.tolist() for vec in model.query_embed(input)]
@@ -3,12 +3,16 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Iterable
 
-import docx
-
 from .types import SupportedDoc
 
 
+# Bump whenever extraction output changes so cached text is re-extracted.
+LOADER_VERSION = 1
+
+
 def load_docx(path: Path) -> Iterable[SupportedDoc]:
+    import docx  # imported lazily; pulls in lxml
+
     try:
         document = docx.Document(str(path))
     except Exception:
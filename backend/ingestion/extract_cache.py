@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from ..config import settings
+from ..metrics import increment
+from .types import SupportedDoc
+
+
+# Minimum seconds between two prunes of the same cache directory.
+PRUNE_INTERVAL_SECONDS = 300.0
+
+_last_prune: Dict[Path, float] = {}
+_prune_guard = threading.Lock()
+
+
+def _cache_dir(cache_dir: Optional[Path] = None) -> Path:
+    base = cache_dir or settings.storage_dir / "extract_cache"
+    base.mkdir(parents=True, exist_ok=True)
+    return base
+
+
+def file_digest(path: Path, blocksize: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(blocksize), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cached_extract(
+    path: Path,
+    kind: str,
+    version: int,
+    loader: Callable[[Path], Iterable[SupportedDoc]],
+    cache_dir: Optional[Path] = None,
+) -> List[SupportedDoc]:
+    """Return the documents ``loader`` extracts from ``path``, parsing only on
+    a cache miss.
+
+    Entries are keyed by content hash plus loader kind and version, so moved or
+    copied files still hit, and bumping a loader's version invalidates its
+    entries. Per-page / per-paragraph text is stored as gzipped JSON.
+    """
+
+    try:
+        digest = file_digest(path)
+    except OSError:
+        return list(loader(path))
+
+    base = _cache_dir(cache_dir)
+    entry = base / digest[:2] / f"{digest}.{kind}-v{version}.json.gz"
+    source_path = str(path.resolve())
+
+    if entry.exists():
+        try:
+            with gzip.open(entry, "rt", encoding="utf-8") as f:
+                records = json.load(f)
+            increment("extract_cache_hit", component="ingestion")
+            try:
+                os.utime(entry)  # mark as recently used for pruning
+            except OSError:
+                pass
+            return [SupportedDoc(source_path=source_path, **record) for record in records]
+        except Exception:
+            pass  # corrupt entry; re-extract below
+
+    increment("extract_cache_miss", component="ingestion")
+    docs = list(loader(path))
+    records = [
+        {"text": doc.text, "start_line": doc.start_line, "end_line": doc.end_line, "extra": doc.extra}
+        for doc in docs
+    ]
+    tmp = entry.with_name(f"{entry.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False)
+        os.replace(tmp, entry)
+    except (OSError, TypeError, ValueError):
+        # Unwritable cache or a loader value JSON cannot hold; just don't cache.
+        tmp.unlink(missing_ok=True)
+    else:
+        _maybe_prune(base)
+    return docs
+
+
+def _maybe_prune(base: Path) -> None:
+    now = time.monotonic()
+    with _prune_guard:
+        last = _last_prune.get(base)
+        if last is not None and now - last < PRUNE_INTERVAL_SECONDS:
+            return
+        _last_prune[base] = now
+    _prune(base)
+
+
+def _prune(base: Path) -> None:
+    """Drop entries unused for longer than the age limit, then the least
+    recently used ones until the cache fits within the size quota."""
+
+    max_age = settings.extract_cache_max_age_days * 86400
+    max_bytes = settings.extract_cache_max_mb * 1024 * 1024
+    now = time.time()
+
+    files = []
+    for path in base.glob("*/*.json.gz"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        if now - stat.st_mtime > max_age:
+            path.unlink(missing_ok=True)
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
@@ -3,12 +3,16 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Iterable
 
-from pypdf import PdfReader
-
 from .types import SupportedDoc
 
 
+# Bump whenever extraction output changes so cached text is re-extracted.
+LOADER_VERSION = 1
+
+
 def load_pdf(path: Path) -> Iterable[SupportedDoc]:
+    from pypdf import PdfReader  # imported lazily; slow to import
+
     try:
         reader = PdfReader(str(path))
     except Exception:
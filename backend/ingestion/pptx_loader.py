@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, List
+
+from .types import SupportedDoc
+
+
+# Bump whenever extraction output changes so cached text is re-extracted.
+LOADER_VERSION = 1
+
+
+def _shape_texts(shape) -> List[str]:
+    texts: List[str] = []
+    if hasattr(shape, "shapes"):  # group shape
+        for child in shape.shapes:
+            texts.extend(_shape_texts(child))
+    elif shape.has_text_frame:
+        if shape.text_frame.text.strip():
+            texts.append(shape.text_frame.text)
+    elif getattr(shape, "has_table", False):
+        for row in shape.table.rows:
+            cells = [cell.text.strip() for cell in row.cells if cell.text.strip()]
+            if cells:
+                texts.append(" | ".join(cells))
+    return texts
+
+
+def load_pptx(path: Path) -> Iterable[SupportedDoc]:
+    """Emit one chunk per slide: title, body text, tables and speaker notes.
+
+    Slides are processed one at a time so only the current slide's text is
+    held alongside the package.
+    """
+
+    from pptx import Presentation  # imported lazily; pulls in lxml
+
+    try:
+        presentation = Presentation(str(path))
+    except Exception:
+        return
+
+    source_path = str(path.resolve())
+    for slide_number, slide in enumerate(presentation.slides, start=1):
+        try:
+            title_shape = slide.shapes.title
+            title = title_shape.text_frame.text.strip() if title_shape is not None else ""
+            texts: List[str] = []
+            for shape in slide.shapes:
+                texts.extend(_shape_texts(shape))
+            if slide.has_notes_slide:
+                notes = slide.notes_slide.notes_text_frame
+                if notes is not None and notes.text.strip():
+                    texts.append(f"Notes: {notes.text}")
+        except Exception:
+            continue
+
+        if not texts:
+            continue
+        extra: dict = {"doc_type": "pptx", "slide": slide_number}
+        if title:
+            extra["slide_title"] = title
+        yield SupportedDoc(
+            source_path=source_path,
+            text=f"Slide {slide_number}\n" + "\n".join(texts),
+            extra=extra,
+        )
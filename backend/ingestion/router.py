@@ -1,48 +1,43 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Optional
 
-from ..utils import is_probably_text, chunk_text
+from ..metrics import timed
 from .types import SupportedDoc
-from .pdf_loader import load_pdf
-from .docx_loader import load_docx
+from .text_loader import load_text
+from .pdf_loader import load_pdf, LOADER_VERSION as PDF_LOADER_VERSION
+from .docx_loader import load_docx, LOADER_VERSION as DOCX_LOADER_VERSION
+from .xlsx_loader import load_xlsx, LOADER_VERSION as XLSX_LOADER_VERSION
+from .pptx_loader import load_pptx, LOADER_VERSION as PPTX_LOADER_VERSION
+from .extract_cache import cached_extract
 
 
-def _load_text_file(path: Path) -> list[SupportedDoc]:
-    if not is_probably_text(path):
-        return []
+def ingest_file(path: Path, cache_dir: Optional[Path] = None) -> Iterable[SupportedDoc]:
+    """Documents for ``path``. Text extracted from PDF and Office files is
+    cached under ``cache_dir`` (default: ``extract_cache`` in the storage dir)."""
 
-    try:
-        raw = path.read_text(encoding="utf-8", errors="ignore")
-    except Exception:
-        return []
-
-    chunks = chunk_text(raw)
-    docs: list[SupportedDoc] = []
-    for idx, chunk in enumerate(chunks):
-        docs.append(
-            SupportedDoc(
-                source_path=str(path.resolve()),
-                text=chunk,
-                extra={"chunk_index": idx},
-            )
-        )
-    return docs
-
-
-def ingest_file(path: Path) -> Iterable[SupportedDoc]:
     suffix = path.suffix.lower()
 
     if suffix in {".txt", ".md", ".py", ".js", ".ts", ".tsx", ".json", ".yaml", ".yml"}:
-        return _load_text_file(path)
+        return load_text(path)
 
     if suffix == ".pdf":
-        return list(load_pdf(path))
+        with timed("load_pdf", component="ingestion"):
+            return cached_extract(path, "pdf", PDF_LOADER_VERSION, load_pdf, cache_dir=cache_dir)
 
     if suffix == ".docx":
-        return list(load_docx(path))
+        with timed("load_docx", component="ingestion"):
+            return cached_extract(path, "docx", DOCX_LOADER_VERSION, load_docx, cache_dir=cache_dir)
+
+    if suffix == ".xlsx":
+        with timed("load_xlsx", component="ingestion"):
+            return cached_extract(path, "xlsx", XLSX_LOADER_VERSION, load_xlsx, cache_dir=cache_dir)
+
+    if suffix == ".pptx":
+        with timed("load_pptx", component="ingestion"):
+            return cached_extract(path, "pptx", PPTX_LOADER_VERSION, load_pptx, cache_dir=cache_dir)
 
-    # TODO: add PDF, DOCX, image, audio, video loaders
+    # TODO: add image, audio, video loaders
 
     return []
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import codecs
+import mmap
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from ..metrics import timed
+from ..utils import iter_chunks
+from .types import SupportedDoc
+
+
+# Files above this size are mapped instead of read into memory.
+MMAP_THRESHOLD = 1024 * 1024
+# Bytes decoded per step while streaming into the chunker.
+DECODE_BLOCK = 64 * 1024
+# Bytes inspected for binary content and encoding.
+SNIFF_BYTES = 64 * 1024
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def sniff_encoding(sample: bytes) -> Optional[str]:
+    """Guess the encoding of ``sample``; ``None`` means it looks binary."""
+
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    # crude binary detection: presence of null bytes
+    if b"\x00" in sample[:1024]:
+        return None
+
+    try:
+        sample.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError as exc:
+        # A multi-byte sequence cut off by the end of the sample is fine.
+        if exc.start >= len(sample) - 3 and exc.reason == "unexpected end of data":
+            return "utf-8"
+
+    # Legacy files on our Windows shares are almost always cp1252; only ask
+    # the detector when the bytes are not valid cp1252.
+    try:
+        sample.decode("cp1252")
+        return "cp1252"
+    except UnicodeDecodeError:
+        pass
+
+    try:
+        from charset_normalizer import from_bytes  # ships with requests
+    except ImportError:
+        return "latin-1"
+    best = from_bytes(sample).best()
+    return best.encoding if best is not None else "latin-1"
+
+
+def _iter_decoded(buffer, encoding: str) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    size = len(buffer)
+    for start in range(0, size, DECODE_BLOCK):
+        yield decoder.decode(buffer[start:start + DECODE_BLOCK], final=start + DECODE_BLOCK >= size)
+
+
+def load_text(path: Path) -> Iterable[SupportedDoc]:
+    """Read a text file once and stream its chunks.
+
+    Small files are read in one call; large ones are memory-mapped. Binary
+    detection and encoding sniffing use the same buffer, and the content is
+    decoded block by block straight into the chunker, so the whole file is
+    never held as one string.
+    """
+
+    source_path = str(path.resolve())
+    try:
+        f = path.open("rb")
+    except OSError:
+        return
+
+    with f, timed("load_text", component="ingestion"):
+        try:
+            size = f.seek(0, 2)
+            f.seek(0)
+            if size == 0:
+                return
+            if size > MMAP_THRESHOLD:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                buffer = f.read()
+        except (OSError, ValueError):
+            return
+
+        try:
+            encoding = sniff_encoding(bytes(buffer[:SNIFF_BYTES]))
+            if encoding is None:
+                return
+            for idx, chunk in enumerate(iter_chunks(_iter_decoded(buffer, encoding))):
+                yield SupportedDoc(
+                    source_path=source_path,
+                    text=chunk,
+                    extra={"chunk_index": idx},
+                )
+        finally:
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from .types import SupportedDoc
+
+
+# Bump whenever extraction output changes so cached text is re-extracted.
+LOADER_VERSION = 2
+# Rows are grouped into chunks of roughly this many characters.
+CHUNK_CHARS = 1200
+
+
+def _format_row(values: tuple) -> str:
+    return " | ".join(str(v).strip() for v in values if v is not None and str(v).strip())
+
+
+def _iter_sheet_chunks(sheet) -> Iterator[tuple[int, int, str]]:
+    """Yield ``(start_row, end_row, text)`` row ranges for one sheet.
+
+    The first non-empty row is treated as the header and repeated at the top
+    of every chunk so each range can be understood on its own.
+    """
+
+    header: Optional[str] = None
+    header_row = 0
+    rows: List[str] = []
+    size = 0
+    start_row = end_row = 0
+
+    for row_number, values in enumerate(sheet.iter_rows(values_only=True), start=1):
+        line = _format_row(values)
+        if not line:
+            continue
+        if header is None:
+            header, header_row = line, row_number
+            continue
+        if rows and size + len(line) > CHUNK_CHARS:
+            yield start_row, end_row, "\n".join([header, *rows])
+            rows, size = [], 0
+        if not rows:
+            start_row = row_number
+        rows.append(line)
+        size += len(line) + 1
+        end_row = row_number
+
+    if rows:
+        yield start_row, end_row, "\n".join([header, *rows])
+    elif header is not None:
+        yield header_row, header_row, header
+
+
+def load_xlsx(path: Path) -> Iterable[SupportedDoc]:
+    """Stream an Excel workbook as row-range chunks, one sheet at a time.
+
+    The workbook is opened read-only, so openpyxl parses rows as they are
+    iterated instead of building the whole sheet in memory.
+    """
+
+    from openpyxl import load_workbook  # imported lazily
+
+    try:
+        workbook = load_workbook(str(path), read_only=True, data_only=True)
+    except Exception:
+        return
+
+    source_path = str(path.resolve())
+    try:
+        for sheet in workbook.worksheets:
+            try:
+                for start_row, end_row, text in _iter_sheet_chunks(sheet):
+                    yield SupportedDoc(
+                        source_path=source_path,
+                        text=f"Sheet: {sheet.title}\n{text}",
+                        extra={
+                            "doc_type": "xlsx",
+                            "sheet": sheet.title,
+                            "start_row": start_row,
+                            "end_row": end_row,
+                        },
+                    )
+            except Exception:
+                continue  # skip a sheet openpyxl cannot read
+    finally:
+        workbook.close()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .config import settings
+from .utils import FileLock
+
+
+_lock = threading.Lock()
+
+
+def _cache_dir() -> Path:
+    base = settings.storage_dir / "lookup_cache"
+    base.mkdir(parents=True, exist_ok=True)
+    return base
+
+
+def _cache_path(source: str) -> Path:
+    return _cache_dir() / f"{source}.json"
+
+
+def normalize_key(value: str) -> str:
+    """Normalize an address or entity name so trivially different spellings
+    ("123 Main St.", "123  main st") share one cache entry."""
+
+    value = value.lower()
+    value = re.sub(r"[^\w\s]", " ", value)
+    return " ".join(value.split())
+
+
+def _load(source: str) -> Dict[str, Dict[str, Any]]:
+    path = _cache_path(source)
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def _save(source: str, data: Dict[str, Dict[str, Any]]) -> None:
+    path = _cache_path(source)
+    tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def get_cached(source: str, key: str) -> Optional[Dict[str, Any]]:
+    """Return the cached lookup data for ``key`` if present and not expired.
+
+    The returned dict is a copy of the scraped data with ``cached`` and
+    ``cached_at`` fields added so callers can show where it came from.
+    """
+
+    ttl_hours = settings.lookup_cache_ttl_hours.get(source)
+    if not ttl_hours:
+        return None
+
+    with _lock:
+        entry = _load(source).get(normalize_key(key))
+    if not entry:
+        return None
+
+    try:
+        fetched_at = datetime.fromisoformat(entry["fetched_at"])
+    except (KeyError, ValueError):
+        return None
+    if datetime.utcnow() - fetched_at > timedelta(hours=ttl_hours):
+        return None
+
+    return {**entry.get("data", {}), "cached": True, "cached_at": entry["fetched_at"]}
+
+
+def put_cached(source: str, key: str, data: Dict[str, Any]) -> None:
+    # Other backend workers write the same file; re-read it under the lock.
+    with _lock, FileLock(_cache_path(source).with_suffix(".lock")):
+        existing = _load(source)
+        existing[normalize_key(key)] = {
+            "fetched_at": datetime.utcnow().isoformat(),
+            "data": data,
+        }
+        _save(source, existing)
@@ -1,13 +1,33 @@
+import uuid
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING
 
-from fastapi import FastAPI, Depends, UploadFile, File, HTTPException
+from fastapi import FastAPI, Depends, UploadFile, File, HTTPException, BackgroundTasks, Path as PathParam
 from fastapi.middleware.cors import CORSMiddleware
-
-from .models import ConfigRequest, IndexRequest, QueryRequest, QueryResponse, DocumentChunk
-from .rag import LocalRAGEngine
+from fastapi.responses import PlainTextResponse
+
+from .models import (
+    ConfigRequest,
+    IndexRequest,
+    QueryRequest,
+    QueryResponse,
+    BatchQueryRequest,
+    BatchQueryResponse,
+    DocumentChunk,
+    WatchRequest,
+    ChatSession,
+    ActiveConfig,
+    SESSION_ID_PATTERN,
+)
+from . import runtime, sessions
+from .metrics import collect_timings, render_prometheus
 from .workflow import router as workflow_router
 
+# rag (chromadb, numpy, document parsers) is imported on first use, inside
+# runtime.get_engine, so the server answers /health without loading it.
+if TYPE_CHECKING:
+    from .rag import LocalRAGEngine
+
 
 app = FastAPI(title="Local RAG Backend", version="0.1.0")
 
@@ -22,19 +42,42 @@ app.add_middleware(
 )
 
 
-_rag_engine: Optional[LocalRAGEngine] = None
-_root_paths: list[Path] = []
+# No engine state lives here: the active configuration is persisted by
+# /config and each worker process builds its engine from it (see runtime.py),
+# so the app can run under ``uvicorn --workers N``.
+
+
+def _require_engine() -> tuple["LocalRAGEngine", list[Path]]:
+    engine, root_paths = runtime.get_engine()
+    if engine is None or not root_paths:
+        raise HTTPException(status_code=400, detail="Backend not configured. Call /config first.")
+    return engine, root_paths
+
+
+@app.on_event("shutdown")
+def _shutdown() -> None:
+    runtime.shutdown()
 
 
 @app.get("/health")
-async def health() -> dict:
-    return {"status": "ok", "indexed_paths": [str(p) for p in _root_paths]}
+def health() -> dict:
+    config = runtime.load_config()
+    return {"status": "ok", "indexed_paths": config.root_paths if config else []}
 
 
-@app.post("/config")
-async def configure(req: ConfigRequest) -> dict:
-    global _rag_engine, _root_paths
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> str:
+    return render_prometheus()
+
 
+@app.get("/stats")
+def stats() -> dict:
+    engine, root_paths = _require_engine()
+    return {"indexed_paths": [str(p) for p in root_paths], **engine.stats()}
+
+
+@app.post("/config")
+def configure(req: ConfigRequest) -> dict:
     if not req.root_paths:
         raise HTTPException(status_code=400, detail="At least one root path is required")
 
@@ -47,37 +90,161 @@ async def configure(req: ConfigRequest) -> dict:
     if not api_key:
         raise HTTPException(status_code=400, detail="Missing OpenAI API key")
 
-    storage_dir = Path.home() / ".local_rag_store"
-    _rag_engine = LocalRAGEngine(storage_dir=storage_dir, openai_api_key=api_key)
-    _root_paths = root_paths
+    # A new version makes every worker rebuild its engine and stops the
+    # watcher, which is bound to the old engine and roots.
+    runtime.save_config(ActiveConfig(
+        version=uuid.uuid4().hex,
+        root_paths=[str(p) for p in root_paths],
+        openai_api_key=api_key,
+    ))
+    runtime.get_engine()
 
     return {"status": "configured", "root_paths": [str(p) for p in root_paths]}
 
 
 @app.post("/index")
-async def index_files(req: IndexRequest) -> dict:
-    if _rag_engine is None or not _root_paths:
-        raise HTTPException(status_code=400, detail="Backend not configured. Call /config first.")
-
-    count = _rag_engine.index_paths(
-        root_paths=_root_paths,
-        include_globs=req.include_globs or None,
-        exclude_globs=req.exclude_globs or None,
-        full_rebuild=req.full_rebuild,
-    )
+def index_files(req: IndexRequest) -> dict:
+    """Index the configured roots.
+
+    A plain ``def`` so indexing runs in the threadpool; during a full rebuild
+    /query keeps answering from the live collection until the swap. Only one
+    worker indexes at a time; the others get a 409.
+    """
+
+    engine, root_paths = _require_engine()
+    try:
+        count = engine.index_paths(
+            root_paths=root_paths,
+            include_globs=req.include_globs or None,
+            exclude_globs=req.exclude_globs or None,
+            full_rebuild=req.full_rebuild,
+        )
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
     return {"indexed_files": count}
 
 
+@app.post("/index/rollback")
+def rollback_index() -> dict:
+    """Serve queries from the index version before the last full rebuild."""
+
+    engine, _ = _require_engine()
+    try:
+        collection = engine.rollback()
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    return {"status": "rolled_back", "collection": collection}
+
+
 @app.post("/query", response_model=QueryResponse)
-async def query(req: QueryRequest) -> QueryResponse:
-    if _rag_engine is None or not _root_paths:
-        raise HTTPException(status_code=400, detail="Backend not configured. Call /config first.")
+def query(req: QueryRequest, background_tasks: BackgroundTasks) -> QueryResponse:
+    engine, _ = _require_engine()
+
+    history = [t.model_dump() for t in (req.history or [])]
+    memory = None
+    reuse_chunk_ids = None
+    max_history: int | None = 5
+    if req.session_id:
+        session = sessions.load_session(req.session_id)
+        # Compaction keeps every turn that is not in the summary here, so all
+        # of them are sent.
+        history = [t.model_dump() for t in session.turns]
+        max_history = None
+        memory = session.summary or None
+        reuse_chunk_ids = sessions.reusable_chunk_ids(session)
+
+    with collect_timings() as timings:
+        try:
+            answer, context_items = engine.query(
+                req.query,
+                history=history,
+                top_k=req.top_k,
+                rerank_k=req.rerank_k,
+                memory=memory,
+                reuse_chunk_ids=reuse_chunk_ids,
+                max_history=max_history,
+            )
+        except RuntimeError as exc:  # index needs a full rebuild
+            raise HTTPException(status_code=409, detail=str(exc))
+
+    if req.session_id:
+        sessions.record_exchange(
+            req.session_id,
+            req.query,
+            answer,
+            [item["chunk_id"] for item in context_items],
+            reused=any(item["reused"] for item in context_items),
+        )
+        background_tasks.add_task(sessions.compact_session, engine, req.session_id)
 
-    answer, context_items = _rag_engine.query(
-        req.query,
-        history=[t.model_dump() for t in (req.history or [])],
-        top_k=req.top_k,
-        rerank_k=req.rerank_k,
-    )
     context_chunks = [DocumentChunk(**item) for item in context_items]
-    return QueryResponse(answer=answer, context=context_chunks)
+    return QueryResponse(
+        answer=answer,
+        context=context_chunks,
+        timings_ms=timings if req.include_timings else None,
+        session_id=req.session_id,
+    )
+
+
+@app.post("/sessions", response_model=ChatSession)
+async def create_session() -> ChatSession:
+    return sessions.create_session()
+
+
+@app.get("/sessions/{session_id}", response_model=ChatSession)
+async def get_session(session_id: str = PathParam(pattern=SESSION_ID_PATTERN)) -> ChatSession:
+    return sessions.load_session(session_id)
+
+
+@app.delete("/sessions/{session_id}")
+def delete_session(session_id: str = PathParam(pattern=SESSION_ID_PATTERN)) -> dict:
+    sessions.delete_session(session_id)
+    return {"status": "deleted"}
+
+
+@app.post("/query/batch", response_model=BatchQueryResponse)
+def query_batch(req: BatchQueryRequest) -> BatchQueryResponse:
+    engine, _ = _require_engine()
+    if not req.queries:
+        raise HTTPException(status_code=400, detail="At least one query is required")
+
+    with collect_timings() as timings:
+        try:
+            answers = engine.query_batch(
+                req.queries,
+                top_k=req.top_k,
+                rerank_k=req.rerank_k,
+                max_concurrency=req.max_concurrency,
+            )
+        except RuntimeError as exc:
+            raise HTTPException(status_code=409, detail=str(exc))
+    results = [
+        QueryResponse(answer=answer, context=[DocumentChunk(**item) for item in context_items])
+        for answer, context_items in answers
+    ]
+    return BatchQueryResponse(results=results, timings_ms=timings if req.include_timings else None)
+
+
+@app.post("/watch/start")
+def start_watch(req: WatchRequest) -> dict:
+    """Opt in to continuous indexing of the configured root paths.
+
+    The setting is shared; one worker picks it up and runs the watcher.
+    """
+
+    _require_engine()
+    runtime.set_watch(req)
+    runtime.reconcile_watcher()
+    return runtime.watch_status()
+
+
+@app.post("/watch/stop")
+def stop_watch() -> dict:
+    runtime.set_watch(None)
+    runtime.reconcile_watcher()
+    return {"status": "stopped"}
+
+
+@app.get("/watch")
+def watch_status() -> dict:
+    return runtime.watch_status()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+# Seconds. Covers sub-millisecond local work up to multi-minute rebuilds.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0,
+)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.counts[bisect_left(self.buckets, value)] += 1
+            self.total += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.total, self.count
+
+
+_histograms: Dict[Tuple[str, str], Histogram] = {}
+_histograms_lock = threading.Lock()
+_counters: Dict[Tuple[str, str], int] = {}
+
+# Per-request collector so endpoints can return a timing breakdown without
+# threading a dict through every call.
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def observe(stage: str, seconds: float, component: str = "rag") -> None:
+    key = (component, stage)
+    with _histograms_lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = Histogram()
+    hist.observe(seconds)
+
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = round(timings.get(stage, 0.0) + seconds * 1000, 2)
+
+
+def increment(event: str, component: str = "rag", amount: int = 1) -> None:
+    key = (component, event)
+    with _histograms_lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+@contextmanager
+def timed(stage: str, component: str = "rag") -> Iterator[None]:
+    """Record the wall time of the enclosed block under ``stage``."""
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start, component=component)
+
+
+@contextmanager
+def collect_timings() -> Iterator[Dict[str, float]]:
+    """Collect the stages timed in this context into a dict of milliseconds."""
+
+    timings: Dict[str, float] = {}
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+def render_prometheus() -> str:
+    """Render every histogram and counter in the Prometheus text exposition
+    format."""
+
+    lines = [
+        "# HELP stage_duration_seconds Wall time spent in each instrumented stage.",
+        "# TYPE stage_duration_seconds histogram",
+    ]
+    with _histograms_lock:
+        items = sorted(_histograms.items())
+        counters = sorted(_counters.items())
+    for (component, stage), hist in items:
+        counts, total, count = hist.snapshot()
+        labels = f'component="{component}",stage="{stage}"'
+        cumulative = 0
+        for bound, n in zip(hist.buckets, counts):
+            cumulative += n
+            lines.append(f'stage_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'stage_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+        lines.append(f"stage_duration_seconds_sum{{{labels}}} {total}")
+        lines.append(f"stage_duration_seconds_count{{{labels}}} {count}")
+
+    lines.append("# HELP events_total Count of notable events (cache hits, retries, ...).")
+    lines.append("# TYPE events_total counter")
+    for (component, event), value in counters:
+        lines.append(f'events_total{{component="{component}",event="{event}"}} {value}')
+    return "\n".join(lines) + "\n"
@@ -1,8 +1,12 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 
+# Chat session ids are uuid4 hex strings; anything else is rejected before it
+# is used in a file name.
+SESSION_ID_PATTERN = r"^[0-9a-f]{32}$"
+
 class ConfigRequest(BaseModel):
     root_paths: List[str]
     openai_api_key: Optional[str] = None
@@ -14,6 +18,24 @@ class IndexRequest(BaseModel):
     exclude_globs: Optional[List[str]] = None
 
 
+class WatchRequest(BaseModel):
+    include_globs: Optional[List[str]] = None
+    exclude_globs: Optional[List[str]] = None
+    # Must be positive; the flush loop ticks at min(0.5, debounce_seconds).
+    debounce_seconds: Optional[float] = Field(default=None, gt=0)
+
+
+class ActiveConfig(BaseModel):
+    """What /config last set, shared by all backend worker processes."""
+
+    # Changes on every /config call so workers know to rebuild their engine.
+    version: str
+    root_paths: List[str]
+    openai_api_key: str
+    # Set while continuous indexing is switched on.
+    watch: Optional[WatchRequest] = None
+
+
 class ChatTurn(BaseModel):
     role: str  # "user" or "assistant"
     content: str
@@ -24,6 +46,18 @@ class QueryRequest(BaseModel):
     top_k: int = 8
     rerank_k: int = 20
     history: Optional[List[ChatTurn]] = None
+    # When set, history is kept server-side and ``history`` is ignored.
+    session_id: Optional[str] = Field(default=None, pattern=SESSION_ID_PATTERN)
+    include_timings: bool = False
+
+
+class BatchQueryRequest(BaseModel):
+    queries: List[str] = Field(max_length=64)
+    top_k: int = 8
+    rerank_k: int = 20
+    # Chat completions in flight at once.
+    max_concurrency: int = 4
+    include_timings: bool = False
 
 
 class DocumentChunk(BaseModel):
@@ -38,6 +72,30 @@ class DocumentChunk(BaseModel):
 class QueryResponse(BaseModel):
     answer: str
     context: List[DocumentChunk]
+    # Per-stage milliseconds, only set when the request asked for timings.
+    timings_ms: Optional[Dict[str, float]] = None
+    session_id: Optional[str] = None
+
+
+class ChatSession(BaseModel):
+    id: str
+    created_at: datetime
+    updated_at: datetime
+    # Running summary of turns that were compacted out of ``turns``.
+    summary: str = ""
+    summarized_turns: int = 0
+    turns: List[ChatTurn] = []
+    # Chunks retrieved for the latest answer, candidates for reuse.
+    retrieved_chunk_ids: List[str] = []
+    # Answers in a row that reused earlier chunks instead of searching.
+    reuse_streak: int = 0
+
+
+class BatchQueryResponse(BaseModel):
+    results: List[QueryResponse]
+    # Per-stage milliseconds for the whole batch; chat time is summed across
+    # the concurrent completions.
+    timings_ms: Optional[Dict[str, float]] = None
 
 
 class WorkflowStepData(BaseModel):
@@ -53,6 +111,8 @@ class WorkflowRun(BaseModel):
     updated_at: datetime
     status: str = "in_progress"  # e.g. in_progress, completed
     steps: List[WorkflowStepData] = []
+    # Bumped on every write; PUT /runs/{id} must send the version it read.
+    version: int = 0
 
 
 class WorkflowCreateRequest(BaseModel):
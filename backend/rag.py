@@ -1,102 +1,591 @@
+import contextvars
+import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
-from typing import List, Iterable, Optional, Dict
+from typing import List, Iterable, Iterator, Optional, Dict
 
 import chromadb
+import numpy as np
 import requests
 
 from .config import settings
+from .embeddings import EmbeddingProvider, LocalEmbeddingFn
 from .ingestion import ingest_file, SupportedDoc
+from .metrics import increment, observe, timed
+from .utils import FileLock
+from .vector_store import RescoreVectorStore, truncate_vectors
+
+
+# Chunks per embeddings request / upsert call. Well under the OpenAI input
+# limit and Chroma's max batch size.
+EMBED_BATCH_SIZE = 256
+# How long an incremental update waits for another process to finish writing.
+WRITER_WAIT_SECONDS = 30.0
+# How long a reloaded-away Chroma System is kept for queries still using it.
+RETIRED_SYSTEM_GRACE_SECONDS = 30.0
 
 
 class OpenAIHttpClient:
     """Very small HTTP client for OpenAI embeddings and chat, using requests."""
 
-    def __init__(self, api_key: str, base_url: str = "https://api.openai.com/v1") -> None:
+    def __init__(self, api_key: str, base_url: str = "https://api.openai.com/v1", max_retries: int = 5) -> None:
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+
+    def _post(self, path: str, payload: dict, timeout: int) -> dict:
+        url = f"{self.base_url}/{path}"
+        for attempt in range(self.max_retries + 1):
+            resp = requests.post(
+                url,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+                json=payload,
+                timeout=timeout,
+            )
+            # Back off on rate limits and transient server errors.
+            if resp.status_code in (429, 500, 502, 503) and attempt < self.max_retries:
+                try:
+                    delay = float(resp.headers.get("Retry-After", ""))
+                except ValueError:
+                    delay = 0.5 * 2**attempt
+                time.sleep(delay)
+                continue
+            resp.raise_for_status()
+            return resp.json()
+        raise RuntimeError("unreachable")
 
-    def embeddings(self, model: str, inputs: List[str]) -> List[List[float]]:
+    def embeddings(self, model: str, inputs: List[str], dimensions: Optional[int] = None) -> List[List[float]]:
         if not inputs:
             return []
-        url = f"{self.base_url}/embeddings"
-        resp = requests.post(
-            url,
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-            },
-            json={"model": model, "input": inputs},
-            timeout=60,
-        )
-        resp.raise_for_status()
-        data = resp.json()
+        payload: dict = {"model": model, "input": inputs}
+        if dimensions:
+            payload["dimensions"] = dimensions
+        data = self._post("embeddings", payload, timeout=60)
         return [item["embedding"] for item in data["data"]]
 
     def chat(self, model: str, messages: List[dict]) -> str:
-        url = f"{self.base_url}/chat/completions"
-        resp = requests.post(
-            url,
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-            },
-            json={"model": model, "messages": messages},
-            timeout=120,
-        )
-        resp.raise_for_status()
-        data = resp.json()
+        data = self._post("chat/completions", {"model": model, "messages": messages}, timeout=120)
         return data["choices"][0]["message"]["content"]
 
 
-class OpenAIEmbeddingFn:
+class OpenAIEmbeddingFn(EmbeddingProvider):
     """Minimal embedding function compatible with Chroma, using OpenAIHttpClient."""
 
-    def __init__(self, http_client: OpenAIHttpClient, model_name: str = "text-embedding-3-large") -> None:
+    def __init__(self, http_client: OpenAIHttpClient, model_name: str = "text-embedding-3-large", dimensions: Optional[int] = None) -> None:
         self._client = http_client
         self._model_name = model_name
+        self._dimensions = dimensions
+        self.name = f"openai:{model_name}"
 
     def __call__(self, input: List[str]) -> List[List[float]]:  # chroma expects a callable(input=[...])
-        return self._client.embeddings(self._model_name, input)
+        return self._client.embeddings(self._model_name, input, dimensions=self._dimensions)
 
 
 class LocalRAGEngine:
-    def __init__(self, storage_dir: Path, openai_api_key: str) -> None:
+    def __init__(
+        self,
+        storage_dir: Path,
+        openai_api_key: str,
+        openai_base_url: Optional[str] = None,
+        embedding_dimensions: Optional[int] = None,
+        rescore_precision: Optional[str] = None,
+    ) -> None:
         self.storage_dir = storage_dir
         self.storage_dir.mkdir(parents=True, exist_ok=True)
 
-        self._openai = OpenAIHttpClient(api_key=openai_api_key)
+        # Shortened vectors in the ANN index, optionally re-ranked against
+        # compact full-dimension copies (see vector_store.py).
+        self.embedding_dimensions = embedding_dimensions or settings.embedding_dimensions
+        self.rescore_precision = rescore_precision or settings.rescore_precision
+
+        self._openai = OpenAIHttpClient(api_key=openai_api_key, base_url=openai_base_url or settings.openai_base_url)
+
+        # Guards swapping the live collection and the rebuild bookkeeping.
+        self._swap_lock = threading.Lock()
+        self._rebuilding = False
+        # Paths the watcher touched during a rebuild, replayed after the swap.
+        self._pending_paths: set[Path] = set()
+
+        # Several backend processes may share storage_dir. Only the holder of
+        # index.lock writes; a write that changed the live index bumps
+        # index_generation so the other processes know to reload their
+        # (in-memory) view of it.
+        self._writer_guard = threading.Lock()
+        self._writer_holds = 0
+        self._writer_lock: Optional[FileLock] = None
+        self._index_changed = False
+        self._reload_lock = threading.Lock()
+        self._generation = self._read_generation()
+        # Chroma System replaced by the last reload, stopped on the next one
+        # (or after RETIRED_SYSTEM_GRACE_SECONDS) once in-flight queries are done.
+        self._retired_system: Optional[tuple] = None
 
         self.client = chromadb.PersistentClient(path=str(self.storage_dir / "chroma"))
         self._init_collection()
 
+    def _make_embedding_fn(self) -> EmbeddingProvider:
+        if settings.embedding_backend == "local":
+            return LocalEmbeddingFn(
+                model_name=settings.local_embedding_model,
+                threads=settings.local_embedding_threads,
+                batch_size=settings.local_embedding_batch_size,
+                cache_dir=str(self.storage_dir / "models"),
+            )
+        if settings.embedding_backend == "openai":
+            # With rescoring we need the full vectors and shorten them locally;
+            # otherwise let the API return shortened vectors directly.
+            api_dims = None if self.rescore_precision else self.embedding_dimensions
+            return OpenAIEmbeddingFn(http_client=self._openai, model_name=settings.openai_embedding_model, dimensions=api_dims)
+        raise ValueError(f"Unknown embedding backend: {settings.embedding_backend}")
+
     def _init_collection(self) -> None:
-        embedding_fn = OpenAIEmbeddingFn(http_client=self._openai, model_name="text-embedding-3-large")
-        self.collection = self.client.get_or_create_collection(
-            name="local-files",
-            embedding_function=embedding_fn,
+        if not hasattr(self, "_embedding_fn"):
+            self._embedding_fn = self._make_embedding_fn()
+        vector_space = self._embedding_fn.name
+        if self.embedding_dimensions:
+            vector_space += f"@{self.embedding_dimensions}"
+        self.vector_space = vector_space
+
+        # The original OpenAI setup keeps the legacy collection name; any other
+        # backend/model/dimension lives in its own collection.
+        if vector_space == "openai:text-embedding-3-large":
+            self.alias = "local-files"
+        else:
+            slug = "".join(c if c.isalnum() else "-" for c in vector_space.lower())
+            self.alias = f"local-files--{slug}"[:63].rstrip("-")
+
+        # Full rebuilds write versioned collections; the alias file says
+        # which one is live. Without an entry the alias name itself is used.
+        self.collection_name = self._read_aliases().get(self.alias, {}).get("active", self.alias)
+        self.collection = self._open_collection(self.collection_name, strict=False)
+        # Set while the live collection cannot serve this configuration; only
+        # a full rebuild (or rollback to a matching version) clears it.
+        self._rebuild_required = self._precision_mismatch(self.collection_name, self.collection)
+        self._rescore_store = self._open_rescore_store(self.collection_name)
+        self._retired_rescore_store: Optional[RescoreVectorStore] = None
+
+    def _open_collection(self, name: str, strict: bool = True, client=None):
+        """Open (or create) ``name`` and check it was built for the configured
+        vector space and rescore precision.
+
+        With ``strict=False`` a precision mismatch is left for the caller to
+        report through ``_precision_mismatch``.
+        """
+
+        precision = self.rescore_precision or "none"
+        client = client or self.client
+        try:
+            # get_or_create_collection would overwrite the recorded metadata.
+            collection = client.get_collection(name=name, embedding_function=self._embedding_fn)
+        except Exception:
+            collection = client.get_or_create_collection(
+                name=name,
+                embedding_function=self._embedding_fn,
+                metadata={"embedding_model": self.vector_space, "rescore_precision": precision},
+            )
+        metadata = collection.metadata or {}
+        recorded = metadata.get("embedding_model")
+        if recorded is not None and recorded != self.vector_space:
+            raise RuntimeError(
+                f"Collection '{name}' holds '{recorded}' vectors, "
+                f"but the configured embedding model is '{self.vector_space}'"
+            )
+        if recorded is None or "rescore_precision" not in metadata:
+            # Collection created before the model / precision was recorded.
+            collection.modify(metadata={
+                "embedding_model": self.vector_space,
+                "rescore_precision": metadata.get("rescore_precision", precision),
+            })
+        elif strict:
+            mismatch = self._precision_mismatch(name, collection)
+            if mismatch:
+                raise RuntimeError(mismatch)
+        return collection
+
+    def _precision_mismatch(self, name: str, collection) -> Optional[str]:
+        # Without matching full vectors in the sidecar store, rescoring would
+        # silently fall back to the shortened-vector distances.
+        recorded = (collection.metadata or {}).get("rescore_precision")
+        precision = self.rescore_precision or "none"
+        if recorded is None or recorded == precision:
+            return None
+        return (
+            f"Collection '{name}' was built with rescore precision '{recorded}', "
+            f"but '{precision}' is configured; run a full rebuild"
         )
 
-    def index_paths(self, root_paths: List[Path], include_globs: List[str] | None = None, exclude_globs: List[str] | None = None, full_rebuild: bool = False) -> int:
-        if full_rebuild:
-            # For a full rebuild, drop and recreate the collection to avoid delete() argument constraints
+    def _open_rescore_store(self, collection_name: str) -> Optional[RescoreVectorStore]:
+        if not self.rescore_precision:
+            return None
+        return RescoreVectorStore(self._rescore_store_path(collection_name), precision=self.rescore_precision)
+
+    def _rescore_store_path(self, collection_name: str) -> Path:
+        return self.storage_dir / "vectors" / f"{collection_name}-{self.rescore_precision}.sqlite"
+
+    def _aliases_path(self) -> Path:
+        return self.storage_dir / "collection_aliases.json"
+
+    def _read_aliases(self) -> Dict[str, dict]:
+        path = self._aliases_path()
+        if not path.exists():
+            return {}
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            return {}
+
+    def _write_aliases(self, aliases: Dict[str, dict]) -> None:
+        path = self._aliases_path()
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(aliases, indent=2), encoding="utf-8")
+        tmp.replace(path)
+
+    def _drop_collection(self, name: str) -> None:
+        try:
+            self.client.delete_collection(name)
+        except Exception:
+            # It's fine if it doesn't exist
+            pass
+        if self.rescore_precision:
+            self._rescore_store_path(name).unlink(missing_ok=True)
+
+    def _activate(self, name: str, collection, rescore_store: Optional[RescoreVectorStore], version: int) -> None:
+        """Point the alias at ``name`` and serve queries from it.
+
+        The collection that was live becomes ``previous`` and is kept for
+        rollback; the one before that is dropped.
+        """
+
+        aliases = self._read_aliases()
+        entry = aliases.get(self.alias, {})
+        outgoing = self.collection_name
+        stale = entry.get("previous")
+        aliases[self.alias] = {"active": name, "previous": outgoing, "version": version}
+        # The alias file is the commit point: once it is replaced, restarts
+        # and other processes see the new collection.
+        self._write_aliases(aliases)
+        self._index_changed = True
+
+        with self._swap_lock:
+            retired = self._retired_rescore_store
+            self.collection_name = name
+            self.collection = collection
+            self._retired_rescore_store = self._rescore_store
+            self._rescore_store = rescore_store
+            self._rebuild_required = None
+
+        if retired is not None:
+            retired.close()
+        if stale and stale not in (name, outgoing):
+            self._drop_collection(stale)
+
+    def _generation_path(self) -> Path:
+        return self.storage_dir / "index_generation"
+
+    def _read_generation(self) -> int:
+        try:
+            return int(self._generation_path().read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return 0
+
+    def _bump_generation(self) -> None:
+        generation = self._read_generation() + 1
+        path = self._generation_path()
+        tmp = path.with_name(f"{path.name}.tmp")
+        tmp.write_text(str(generation), encoding="utf-8")
+        tmp.replace(path)
+        self._generation = generation
+
+    def refresh(self) -> None:
+        """Reload the index if another process has written to it.
+
+        Chroma keeps each collection's vector index in memory, so writes made
+        by another process only become visible after reopening the store. The
+        new store is opened beside the live one and swapped in, so queries
+        never wait for a reload. Called periodically by the worker's reconcile
+        loop and before every write, not on the query path.
+        """
+
+        self._stop_retired_system()
+        if self._read_generation() == self._generation:
+            return
+        with self._reload_lock:
+            generation = self._read_generation()
+            if generation == self._generation:
+                return
+            with timed("reload"):
+                old_system = self.client._system
+                # A new client would otherwise reuse the cached in-memory system.
+                chromadb.api.client.SharedSystemClient.clear_system_cache()
+                client = chromadb.PersistentClient(path=str(self.storage_dir / "chroma"))
+                name = self._read_aliases().get(self.alias, {}).get("active", self.alias)
+                collection = self._open_collection(name, strict=False, client=client)
+                rescore_store = self._open_rescore_store(name)
+                with self._swap_lock:
+                    retired = self._retired_rescore_store
+                    self.client = client
+                    self.collection_name = name
+                    self.collection = collection
+                    self._retired_rescore_store = self._rescore_store
+                    self._rescore_store = rescore_store
+                    self._rebuild_required = self._precision_mismatch(name, collection)
+                if retired is not None:
+                    retired.close()
+                self._stop_retired_system(force=True)
+                self._retired_system = (old_system, time.monotonic())
+            self._generation = generation
+
+    def _stop_retired_system(self, force: bool = False) -> None:
+        retired = self._retired_system
+        if retired is None:
+            return
+        system, retired_at = retired
+        if not force and time.monotonic() - retired_at < RETIRED_SYSTEM_GRACE_SECONDS:
+            return
+        self._retired_system = None
+        try:
+            system.stop()
+        except Exception:
+            pass
+
+    @contextmanager
+    def _writer(self, timeout: float) -> Iterator[None]:
+        """Hold the cross-process write lock on the index.
+
+        Threads of this process share one hold (so the watcher can keep
+        updating the live collection during a rebuild); other processes wait
+        up to ``timeout`` seconds and then get a RuntimeError.
+        """
+
+        with self._writer_guard:
+            if self._writer_holds == 0:
+                lock = FileLock(self.storage_dir / "index.lock", timeout=timeout, stale_after=60.0, keep_alive=True)
+                try:
+                    lock.__enter__()
+                except TimeoutError:
+                    raise RuntimeError("The index is being written by another worker") from None
+                self._writer_lock = lock
+                # Never write on top of a stale view of another worker's writes.
+                self.refresh()
+            self._writer_holds += 1
+        try:
+            yield
+        finally:
+            with self._writer_guard:
+                # Publish only writes that changed the live index (also when a
+                # later step failed: the changes made so far are on disk).
+                if self._index_changed:
+                    self._bump_generation()
+                    self._index_changed = False
+                self._writer_holds -= 1
+                if self._writer_holds == 0 and self._writer_lock is not None:
+                    self._writer_lock.__exit__(None, None, None)
+                    self._writer_lock = None
+
+    def _live(self) -> tuple:
+        """The live collection and its rescore store, read together.
+
+        Raises RuntimeError if the collection must be rebuilt first.
+        """
+
+        with self._swap_lock:
+            if self._rebuild_required:
+                raise RuntimeError(self._rebuild_required)
+            return self.collection, self._rescore_store
+
+    def rollback(self) -> str:
+        """Make the previous collection live again; returns its name."""
+
+        with self._writer(timeout=0):
+            # The rebuild's writer hold is shared in-process, so check explicitly.
+            with self._swap_lock:
+                if self._rebuilding:
+                    raise RuntimeError("A full rebuild is running; roll back after it finishes")
+            entry = self._read_aliases().get(self.alias, {})
+            previous = entry.get("previous")
+            if not previous:
+                raise RuntimeError("No previous index version to roll back to")
+            collection = self._open_collection(previous)
+            self._activate(previous, collection, self._open_rescore_store(previous), entry.get("version", 0))
+        return previous
+
+    def _embed(self, texts: List[str], query: bool = False) -> tuple[List[List[float]], Optional[List[List[float]]]]:
+        """Return (index vectors, full vectors for rescoring or None)."""
+
+        vectors = self._embedding_fn.embed_query(texts) if query else self._embedding_fn(texts)
+        full = vectors if self.rescore_precision else None
+        if vectors and self.embedding_dimensions and len(vectors[0]) > self.embedding_dimensions:
+            vectors = truncate_vectors(vectors, self.embedding_dimensions)
+        return vectors, full
+
+    def _index_stats_path(self) -> Path:
+        return self.storage_dir / "index_stats.json"
+
+    def stats(self) -> dict:
+        """Corpus size, chunk count and details of the last index run."""
+
+        last: dict = {}
+        path = self._index_stats_path()
+        if path.exists():
             try:
-                self.client.delete_collection("local-files")
+                last = json.loads(path.read_text(encoding="utf-8"))
             except Exception:
-                # It's fine if it doesn't exist yet
-                pass
-            self._init_collection()
+                last = {}
+        entry = self._read_aliases().get(self.alias, {})
+        return {
+            "chunk_count": self.collection.count(),
+            "collection": self.collection_name,
+            "previous_collection": entry.get("previous"),
+            "rebuilding": self._rebuilding,
+            "rebuild_required": self._rebuild_required,
+            "writer_active": (self.storage_dir / "index.lock").exists(),
+            "last_index": last,
+        }
+
+    def index_paths(self, root_paths: List[Path], include_globs: List[str] | None = None, exclude_globs: List[str] | None = None, full_rebuild: bool = False) -> int:
+        """Index every matching file under ``root_paths``.
+
+        A full rebuild is written into a new versioned shadow collection while
+        queries keep reading the live one; the alias is swapped only once the
+        shadow is complete, and the old collection is kept for ``rollback``.
+        """
+
+        with self._writer(timeout=0):
+            if full_rebuild:
+                # Mark the rebuild before walking so watcher updates made while
+                # the corpus is parsed are recorded and replayed after the swap.
+                with self._swap_lock:
+                    if self._rebuilding:
+                        raise RuntimeError("A full rebuild is already running")
+                    self._rebuilding = True
+                    self._pending_paths.clear()
+            try:
+                include_globs = include_globs or settings.default_include_globs
+                exclude_globs = exclude_globs or settings.default_exclude_globs
+
+                started = time.perf_counter()
+                with timed("walk"):
+                    files = list(self._iter_files(root_paths, include_globs, exclude_globs))
+                ids, texts, metadatas, total_bytes = self._collect_documents(files)
+                if full_rebuild:
+                    self._rebuild_into_shadow(ids, texts, metadatas)
+                else:
+                    with self._swap_lock:
+                        # A full rebuild in this process may have parsed these
+                        # files earlier; replay them after its swap.
+                        if self._rebuilding:
+                            self._pending_paths.update(files)
+                    if ids:
+                        self._index_changed = True
+                        self._embed_and_upsert(ids, texts, metadatas)
+            finally:
+                if full_rebuild:
+                    with self._swap_lock:
+                        self._rebuilding = False
+
+            duration = time.perf_counter() - started
+            observe("index_total", duration)
+            self._index_stats_path().write_text(
+                json.dumps({
+                    "files": len(files),
+                    "bytes": total_bytes,
+                    "chunks": len(ids),
+                    "duration_seconds": round(duration, 3),
+                    "full_rebuild": full_rebuild,
+                    "finished_at": datetime.utcnow().isoformat(),
+                }, indent=2),
+                encoding="utf-8",
+            )
+        return len(ids)
+
+    def _rebuild_into_shadow(self, ids: List[str], texts: List[str], metadatas: List[dict]) -> None:
+        """Write a full rebuild into a new collection and swap it in. Called by
+        ``index_paths`` with ``_rebuilding`` already set."""
+
+        version = self._read_aliases().get(self.alias, {}).get("version", 0) + 1
+        shadow_name = f"{self.alias[:54]}--v{version}"
+        # Leftovers from an interrupted rebuild of the same version.
+        self._drop_collection(shadow_name)
+        shadow = self._open_collection(shadow_name)
+        shadow_store = self._open_rescore_store(shadow_name)
+        try:
+            self._embed_and_upsert(ids, texts, metadatas, collection=shadow, rescore_store=shadow_store)
+        except BaseException:
+            if shadow_store is not None:
+                shadow_store.close()
+            self._drop_collection(shadow_name)
+            raise
+
+        with timed("swap"):
+            self._activate(shadow_name, shadow, shadow_store, version)
+        with self._swap_lock:
+            self._rebuilding = False
+            pending = set(self._pending_paths)
+        # Files the watcher touched after the rebuild walked or parsed them were
+        # only applied to the old collection; replay them on the new one. What
+        # is on disk now decides, since a path may have been both removed and
+        # re-created meanwhile.
+        if pending:
+            self.update_files([p for p in pending if p.is_file()], [p for p in pending if not p.is_file()])
+
+    def update_files(self, changed: Iterable[Path], removed: Iterable[Path] = ()) -> int:
+        """Incrementally re-index ``changed`` files and drop ``removed`` ones.
 
-        include_globs = include_globs or settings.default_include_globs
-        exclude_globs = exclude_globs or settings.default_exclude_globs
+        Existing chunks of every touched file are deleted first so a file that
+        shrank does not leave stale chunks behind. Returns the number of
+        chunks written.
+        """
 
-        files = list(self._iter_files(root_paths, include_globs, exclude_globs))
+        with self._writer(timeout=WRITER_WAIT_SECONDS):
+            changed = [p for p in changed if p.is_file()]
+            removed = list(removed)
+            with self._swap_lock:
+                if self._rebuilding:
+                    self._pending_paths.update(changed)
+                    self._pending_paths.update(removed)
+            collection, rescore_store = self._live()
+            if removed or changed:
+                self._index_changed = True
+            for path in [*removed, *changed]:
+                with timed("delete"):
+                    collection.delete(where={"source_path": str(path.resolve())})
+                    if rescore_store is not None:
+                        rescore_store.delete_source(str(path.resolve()))
+
+            ids, texts, metadatas, _ = self._collect_documents(changed)
+            self._embed_and_upsert(ids, texts, metadatas, collection=collection, rescore_store=rescore_store)
+        return len(ids)
+
+    def indexed_sources(self, directory: Path) -> List[Path]:
+        """Source files under ``directory`` that have chunks in the live index."""
+
+        prefix = str(directory.resolve()).rstrip(os.sep) + os.sep
+        found = self._live()[0].get(include=["metadatas"])
+        sources = {meta.get("source_path", "") for meta in found["metadatas"] or []}
+        return [Path(source) for source in sorted(sources) if source.startswith(prefix)]
+
+    def _collect_documents(self, files: Iterable[Path]) -> tuple[List[str], List[str], List[dict], int]:
         ids: List[str] = []
         texts: List[str] = []
         metadatas: List[dict] = []
+        total_bytes = 0
 
         for file_path in files:
-            for doc_idx, doc in enumerate(ingest_file(file_path)):
+            try:
+                total_bytes += file_path.stat().st_size
+            except OSError:
+                pass
+            with timed("parse"):
+                file_docs = list(ingest_file(file_path, cache_dir=self.storage_dir / "extract_cache"))
+            for doc_idx, doc in enumerate(file_docs):
                 doc_id = f"{doc.source_path}::chunk-{doc_idx}"
                 ids.append(doc_id)
                 texts.append(doc.text)
@@ -111,33 +600,188 @@ class LocalRAGEngine:
                     metadata.update(doc.extra)
                 metadatas.append(metadata)
 
-        if ids:
-            self.collection.upsert(ids=ids, documents=texts, metadatas=metadatas)
-        return len(ids)
+        return ids, texts, metadatas, total_bytes
+
+    def _embed_and_upsert(
+        self,
+        ids: List[str],
+        texts: List[str],
+        metadatas: List[dict],
+        collection=None,
+        rescore_store: Optional[RescoreVectorStore] = None,
+    ) -> None:
+        if collection is None:
+            collection, rescore_store = self._live()
+        # Embed explicitly (rather than letting Chroma do it inside upsert) so
+        # embedding and upsert time are measured separately.
+        for start in range(0, len(ids), EMBED_BATCH_SIZE):
+            end = start + EMBED_BATCH_SIZE
+            with timed("embed"):
+                embeddings, full = self._embed(texts[start:end])
+            with timed("upsert"):
+                collection.upsert(
+                    ids=ids[start:end],
+                    documents=texts[start:end],
+                    embeddings=embeddings,
+                    metadatas=metadatas[start:end],
+                )
+                if full is not None:
+                    rescore_store.upsert(ids[start:end], [m["source_path"] for m in metadatas[start:end]], full)
+
+    def retrieve(self, query: str, top_k: int = 8, rerank_k: int = 20, reuse_chunk_ids: Optional[List[str]] = None) -> List[dict]:
+        """Nearest chunks for ``query`` as dicts with ``chunk_id``, ``text``,
+        ``metadata`` and ``distance`` (lower is closer).
+
+        ``reuse_chunk_ids`` are chunks retrieved for an earlier turn of the
+        same conversation; if they are still close to the query they are
+        re-ranked and returned without searching the index.
+        """
+
+        with timed("query_embed"):
+            query_embeddings, query_full = self._embed([query], query=True)
+        if reuse_chunk_ids:
+            hits = self._reuse_hits(query_embeddings[0], reuse_chunk_ids, top_k)
+            if hits is not None:
+                return hits
+        return self._search(query_embeddings, query_full, top_k, rerank_k)[0]
+
+    def retrieve_many(self, queries: List[str], top_k: int = 8, rerank_k: int = 20) -> List[List[dict]]:
+        """``retrieve`` for several queries with one embeddings request per
+        ``EMBED_BATCH_SIZE`` queries and one multi-vector Chroma query."""
+
+        if not queries:
+            return []
+        query_embeddings: List[List[float]] = []
+        query_full: Optional[List[List[float]]] = [] if self.rescore_precision else None
+        with timed("query_embed"):
+            for start in range(0, len(queries), EMBED_BATCH_SIZE):
+                vectors, full = self._embed(queries[start:start + EMBED_BATCH_SIZE], query=True)
+                query_embeddings.extend(vectors)
+                if query_full is not None:
+                    query_full.extend(full)
+        return self._search(query_embeddings, query_full, top_k, rerank_k)
+
+    def _search(self, query_embeddings: List[List[float]], query_full: Optional[List[List[float]]], top_k: int, rerank_k: int) -> List[List[dict]]:
+        # With rescoring, over-fetch rerank_k candidates from the shortened
+        # index and keep the top_k by full-dimension similarity.
+        n_results = max(top_k, rerank_k) if query_full is not None else top_k
+        collection, rescore_store = self._live()
+        with timed("ann_search"):
+            results = collection.query(query_embeddings=query_embeddings, n_results=n_results)
+
+        per_query: List[List[dict]] = []
+        for i in range(len(query_embeddings)):
+            per_query.append([
+                {"chunk_id": chunk_id, "text": doc, "metadata": meta, "distance": float(dist)}
+                for chunk_id, doc, meta, dist in zip(
+                    results["ids"][i], results["documents"][i], results["metadatas"][i], results["distances"][i]
+                )
+            ])
+
+        if query_full is not None:
+            with timed("rescore"):
+                # Candidates shared between queries are loaded once.
+                stored = rescore_store.get(list({hit["chunk_id"] for hits in per_query for hit in hits}))
+                per_query = [self._rescore(vec, hits, stored) for vec, hits in zip(query_full, per_query)]
+        return [hits[:top_k] for hits in per_query]
+
+    def _reuse_hits(self, query_embedding: List[float], chunk_ids: List[str], top_k: int) -> Optional[List[dict]]:
+        threshold = settings.chat_reuse_similarity.get(self._embedding_fn.name)
+        if threshold is None:
+            return None  # no calibrated threshold for this model
+        with timed("reuse_check"):
+            found = self._live()[0].get(ids=chunk_ids, include=["embeddings", "documents", "metadatas"])
+            if not found["ids"]:
+                return None
+            q = np.asarray(query_embedding, dtype=np.float32)
+            q /= np.linalg.norm(q) or 1.0
+            vecs = np.asarray(found["embeddings"], dtype=np.float32)
+            vecs /= np.linalg.norm(vecs, axis=1, keepdims=True).clip(min=1e-12)
+            similarity = vecs @ q
+        # Only chunks still relevant to this question are reused; if none
+        # are, search the index.
+        hits = [
+            # Squared L2 between unit vectors, matching Chroma's default metric.
+            {"chunk_id": chunk_id, "text": doc, "metadata": meta, "distance": float(2 - 2 * sim), "reused": True}
+            for chunk_id, doc, meta, sim in zip(found["ids"], found["documents"], found["metadatas"], similarity)
+            if sim >= threshold
+        ]
+        if not hits:
+            return None
+        increment("retrieval_reused")
+        hits.sort(key=lambda hit: hit["distance"])
+        return hits[:top_k]
+
+    def query(
+        self,
+        query: str,
+        history: Optional[List[Dict[str, str]]] = None,
+        top_k: int = 8,
+        rerank_k: int = 20,
+        memory: Optional[str] = None,
+        reuse_chunk_ids: Optional[List[str]] = None,
+        max_history: Optional[int] = 5,
+    ) -> tuple[str, List[dict]]:
+        """Retrieve context for ``query`` and answer it.
+
+        Only the last ``max_history`` turns of ``history`` are sent; pass
+        ``None`` for session history, where every turn not yet folded into
+        ``memory`` has to reach the model.
+        """
 
-    def query(self, query: str, history: Optional[List[Dict[str, str]]] = None, top_k: int = 8, rerank_k: int = 20) -> tuple[str, List[dict]]:
         # Basic retrieval from Chroma
-        results = self.collection.query(query_texts=[query], n_results=top_k)
-        docs = results["documents"][0]
-        metadatas = results["metadatas"][0]
-        distances = results["distances"][0]
+        hits = self.retrieve(query, top_k=top_k, rerank_k=rerank_k, reuse_chunk_ids=reuse_chunk_ids)
+        return self._answer(query, hits, history, memory=memory, max_history=max_history)
+
+    def query_batch(self, queries: List[str], top_k: int = 8, rerank_k: int = 20, max_concurrency: int = 4) -> List[tuple[str, List[dict]]]:
+        """Answer several independent questions at once.
+
+        Retrieval is batched into one embedding call and one Chroma query; the
+        chat completions then run concurrently, at most ``max_concurrency`` at
+        a time, so the batch takes about as long as its slowest answer.
+        """
+
+        hits_per_query = self.retrieve_many(queries, top_k=top_k, rerank_k=rerank_k)
+        workers = max(1, min(max_concurrency, len(queries)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="query-batch") as pool:
+            futures = [
+                # copy_context keeps per-request timing collection working in the workers
+                pool.submit(contextvars.copy_context().run, self._answer, query, hits, None)
+                for query, hits in zip(queries, hits_per_query)
+            ]
+            return [future.result() for future in futures]
 
+    def _answer(
+        self,
+        query: str,
+        hits: List[dict],
+        history: Optional[List[Dict[str, str]]],
+        memory: Optional[str] = None,
+        max_history: Optional[int] = 5,
+    ) -> tuple[str, List[dict]]:
         context_snippets: List[str] = []
         context_items: List[dict] = []
-        for doc, meta, dist in zip(docs, metadatas, distances):
-            snippet = doc[:1200]
+        for hit in hits:
+            meta = hit["metadata"]
+            snippet = hit["text"][:1200]
             context_snippets.append(snippet)
             context_items.append({
                 "id": meta.get("source_path", ""),
                 "text": snippet,
-                "score": float(dist),
+                "score": hit["distance"],
                 "source_path": meta.get("source_path", ""),
+                "chunk_id": hit["chunk_id"],
+                "reused": hit.get("reused", False),
             })
 
-        prompt = self._build_prompt(query, context_snippets)
+        with timed("prompt_build"):
+            prompt = self._build_prompt(query, context_snippets)
 
         history_msgs: List[Dict[str, str]] = []
-        for turn in (history or [])[-5:]:  # only last 5 messages
+        turns = history or []
+        if max_history is not None:
+            turns = turns[-max_history:]
+        for turn in turns:
             role = turn.get("role", "user")
             content = turn.get("content", "")
             if not content:
@@ -152,13 +796,43 @@ class LocalRAGEngine:
             *history_msgs,
             {"role": "user", "content": prompt},
         ]
+        if memory:
+            messages.insert(1, {"role": "system", "content": f"Summary of the earlier conversation:\n{memory}"})
 
-        answer = self._openai.chat(
-            model="gpt-4.1-mini",
-            messages=messages,
-        )
+        with timed("chat_completion"):
+            answer = self._openai.chat(
+                model="gpt-4.1-mini",
+                messages=messages,
+            )
         return answer, context_items
 
+    def summarize(self, previous_summary: str, turns: List[Dict[str, str]]) -> str:
+        """Fold ``turns`` into a running conversation summary."""
+
+        transcript = "\n".join(f"{t.get('role', 'user')}: {t.get('content', '')}" for t in turns)
+        messages = [
+            {
+                "role": "system",
+                "content": "Maintain a compact summary of a conversation about the user's files. Keep facts, names, file paths and open questions; drop pleasantries. Reply with the updated summary only.",
+            },
+            {
+                "role": "user",
+                "content": f"Current summary:\n{previous_summary or '(empty)'}\n\nNew turns:\n{transcript}",
+            },
+        ]
+        with timed("summarize"):
+            return self._openai.chat(model="gpt-4.1-mini", messages=messages)
+
+    def _rescore(self, query_vec: List[float], hits: List[dict], stored: Dict[str, np.ndarray]) -> List[dict]:
+        q = np.asarray(query_vec, dtype=np.float32)
+        q /= np.linalg.norm(q) or 1.0
+        for hit in hits:
+            vec = stored.get(hit["chunk_id"])
+            if vec is not None:
+                # Squared L2 between unit vectors, matching Chroma's default metric.
+                hit["distance"] = float(2 - 2 * np.dot(q, vec / (np.linalg.norm(vec) or 1.0)))
+        return sorted(hits, key=lambda hit: hit["distance"])
+
     def _iter_files(self, root_paths: Iterable[Path], include_globs: List[str] | None, exclude_globs: List[str] | None) -> Iterable[Path]:
         include_globs = include_globs or ["**/*.txt", "**/*.md", "**/*.py", "**/*.json", "**/*.yaml", "**/*.yml"]
         exclude_globs = exclude_globs or ["**/.git/**", "**/.venv/**", "**/node_modules/**", "**/.idea/**", "**/.vscode/**"]
@@ -175,6 +849,14 @@ class LocalRAGEngine:
                         continue
                     yield path
 
+    @staticmethod
+    def matches_globs(path: Path, include_globs: List[str], exclude_globs: List[str]) -> bool:
+        """Whether a single path would be picked up by ``_iter_files``."""
+
+        if any(path.match(ex_pat) for ex_pat in exclude_globs):
+            return False
+        return any(path.match(pattern) for pattern in include_globs)
+
     def _build_prompt(self, query: str, context_snippets: List[str]) -> str:
         context_block = "\n\n".join(f"[Document {i+1}]\n" + snippet for i, snippet in enumerate(context_snippets))
         return (
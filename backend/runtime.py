@@ -0,0 +1,256 @@
+"""Per-process view of the backend state shared through the storage dir.
+
+/config writes ``active_config.json``; every uvicorn worker builds its own
+engine from it on first use and rebuilds it when the file changes, so any
+worker can serve any request. Continuous indexing runs in exactly one worker:
+whichever holds ``watch.lock``. A background reconcile loop in each worker
+reloads its view of the index after another worker wrote to it, and starts,
+restarts or stops its watcher to match the shared config, taking over if the
+owning worker dies.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
+
+from .config import settings
+from .models import ActiveConfig, WatchRequest
+from .utils import FileLock
+
+# rag (chromadb, numpy, document parsers) and the watcher are imported on
+# first use so the server answers /health without loading them.
+if TYPE_CHECKING:
+    from .rag import LocalRAGEngine
+    from .watcher import IndexWatcher
+
+
+logger = logging.getLogger(__name__)
+
+
+def _config_path() -> Path:
+    settings.storage_dir.mkdir(parents=True, exist_ok=True)
+    return settings.storage_dir / "active_config.json"
+
+
+class _WorkerState:
+    def __init__(self) -> None:
+        # Guards the engine / watcher fields; never held across slow work.
+        self.lock = threading.RLock()
+        # The config cache has its own lock so /health never waits on engines.
+        self.config_lock = threading.Lock()
+        # Serializes engine builds, which run outside ``lock``.
+        self.build_lock = threading.Lock()
+        self.config: Optional[ActiveConfig] = None
+        self.config_mtime: Optional[float] = None
+        self.engine: Optional["LocalRAGEngine"] = None
+        self.engine_version: Optional[str] = None
+        self.watcher: Optional["IndexWatcher"] = None
+        self.watcher_request: Optional[WatchRequest] = None
+        self.watch_lock: Optional[FileLock] = None
+        self.reconciler: Optional[threading.Thread] = None
+        self.stopping = threading.Event()
+
+
+_state = _WorkerState()
+
+
+def load_config() -> Optional[ActiveConfig]:
+    """The shared config, re-read only when the file's mtime changes."""
+
+    path = _config_path()
+    with _state.config_lock:
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            mtime = None
+        if mtime != _state.config_mtime:
+            config = None
+            if mtime is not None:
+                try:
+                    config = ActiveConfig.model_validate_json(path.read_text(encoding="utf-8"))
+                except Exception:
+                    config = _state.config  # mid-write or corrupt; keep the last good one
+            _state.config = config
+            _state.config_mtime = mtime
+        return _state.config
+
+
+def _write_config(config: ActiveConfig) -> None:
+    path = _config_path()
+    tmp = path.with_suffix(".json.tmp")
+    # The file holds the OpenAI API key: owner read/write only. (On Windows
+    # only the read-only bit applies; the store lives in the user's profile.)
+    fd = os.open(str(tmp), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.chmod(tmp, 0o600)  # a leftover tmp file keeps its old mode otherwise
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(json.dumps(config.model_dump(), indent=2))
+    os.replace(tmp, path)
+
+
+def save_config(config: ActiveConfig) -> None:
+    with FileLock(_config_path().with_suffix(".lock")):
+        _write_config(config)
+
+
+def set_watch(watch: Optional[WatchRequest]) -> None:
+    """Switch continuous indexing on (``watch``) or off (``None``) for all workers."""
+
+    with FileLock(_config_path().with_suffix(".lock")):
+        config = load_config()
+        if config is None:
+            return
+        _write_config(config.model_copy(update={"watch": watch}))
+
+
+def get_engine() -> tuple[Optional["LocalRAGEngine"], list[Path]]:
+    """This worker's engine and root paths, built lazily from the shared config.
+
+    Returns ``(None, [])`` until /config has been called by any worker. Cheap
+    once built: the watcher is reconciled by the background loop, never on
+    the request path.
+    """
+
+    config = load_config()
+    if config is None:
+        return None, []
+    root_paths = [Path(p) for p in config.root_paths]
+
+    engine = _current_engine(config)
+    if engine is None:
+        # Opening the store takes seconds; build without holding _state.lock
+        # and swap the new engine in once it is ready.
+        with _state.build_lock:
+            engine = _current_engine(config)
+            if engine is None:
+                from .rag import LocalRAGEngine
+
+                engine = LocalRAGEngine(storage_dir=settings.storage_dir, openai_api_key=config.openai_api_key)
+                with _state.lock:
+                    # The watcher is bound to the old engine and roots.
+                    retired = _detach_watcher()
+                    _state.engine, _state.engine_version = engine, config.version
+                _release_watcher(retired)
+
+    with _state.lock:
+        if _state.reconciler is None:
+            _state.reconciler = threading.Thread(target=_reconcile_loop, name="worker-reconcile", daemon=True)
+            _state.reconciler.start()
+    return engine, root_paths
+
+
+def _current_engine(config: ActiveConfig) -> Optional["LocalRAGEngine"]:
+    with _state.lock:
+        if _state.engine is not None and _state.engine_version == config.version:
+            return _state.engine
+        return None
+
+
+def reconcile_watcher() -> None:
+    """Start, restart or stop this worker's watcher to match the shared config.
+
+    Watcher threads are started and joined outside ``_state.lock`` so
+    requests in this worker never wait on them.
+    """
+
+    config = load_config()
+    wanted = config.watch if config is not None else None
+    with _state.lock:
+        current_config = config is not None and _state.engine_version == config.version
+        retired = None
+        if _state.watcher is not None and (wanted is None or wanted != _state.watcher_request or not current_config):
+            retired = _detach_watcher()
+        start = wanted is not None and _state.watcher is None and _state.engine is not None and current_config
+        engine = _state.engine
+    _release_watcher(retired)
+    if not start:
+        return
+
+    # watch.lock also keeps a concurrent reconcile in this process from
+    # starting a second watcher.
+    lock = FileLock(settings.storage_dir / "watch.lock", timeout=0, keep_alive=True)
+    try:
+        lock.__enter__()
+    except TimeoutError:
+        return  # another worker is watching
+
+    from .watcher import IndexWatcher
+
+    watcher = IndexWatcher(
+        engine,
+        [Path(p) for p in config.root_paths],
+        include_globs=wanted.include_globs or None,
+        exclude_globs=wanted.exclude_globs or None,
+        debounce_seconds=wanted.debounce_seconds,
+    )
+    try:
+        watcher.start()
+    except Exception:
+        lock.__exit__(None, None, None)
+        raise
+    with _state.lock:
+        if _state.engine is engine and _state.watcher is None:
+            _state.watcher, _state.watcher_request, _state.watch_lock = watcher, wanted, lock
+            return
+    # The engine was rebuilt while the watcher started.
+    _release_watcher((watcher, lock))
+
+
+def _detach_watcher() -> Optional[tuple["IndexWatcher", Optional[FileLock]]]:
+    """Take the watcher out of the worker state; stop it with
+    ``_release_watcher`` once ``_state.lock`` is released."""
+
+    with _state.lock:
+        if _state.watcher is None:
+            return None
+        detached = (_state.watcher, _state.watch_lock)
+        _state.watcher = _state.watcher_request = _state.watch_lock = None
+        return detached
+
+
+def _release_watcher(detached: Optional[tuple["IndexWatcher", Optional[FileLock]]]) -> None:
+    if detached is None:
+        return
+    watcher, lock = detached
+    try:
+        watcher.stop()
+    finally:
+        if lock is not None:
+            lock.__exit__(None, None, None)
+
+
+def _stop_watcher() -> None:
+    _release_watcher(_detach_watcher())
+
+
+def _reconcile_loop() -> None:
+    while not _state.stopping.wait(settings.watch_poll_interval_seconds):
+        try:
+            if load_config() is not None and _state.engine is not None:
+                engine, _ = get_engine()
+                # Pick up index writes by other workers here rather than
+                # inside the next query.
+                engine.refresh()
+                reconcile_watcher()
+        except Exception:
+            logger.exception("Worker reconcile failed")
+
+
+def watch_status() -> dict:
+    config = load_config()
+    if config is None or config.watch is None:
+        return {"status": "stopped"}
+    with _state.lock:
+        if _state.watcher is not None:
+            return {"status": "watching", "worker_pid": os.getpid(), **_state.watcher.status()}
+    # Watching happens in another worker; its counters are not visible here.
+    return {"status": "watching", "root_paths": config.root_paths}
+
+
+def shutdown() -> None:
+    _state.stopping.set()
+    _stop_watcher()
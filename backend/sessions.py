@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import re
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Set, TYPE_CHECKING
+
+from fastapi import HTTPException
+
+from .config import settings
+from .models import SESSION_ID_PATTERN, ChatSession, ChatTurn
+from .utils import FileLock
+
+if TYPE_CHECKING:
+    from .rag import LocalRAGEngine
+
+
+def _sessions_dir() -> Path:
+    base = settings.storage_dir / "chat_sessions"
+    base.mkdir(parents=True, exist_ok=True)
+    return base
+
+
+def _session_path(session_id: str) -> Path:
+    if not re.fullmatch(SESSION_ID_PATTERN, session_id):
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    return _sessions_dir() / f"{session_id}.json"
+
+
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+# Sessions with a summary being generated in this process.
+_compacting: Set[str] = set()
+_compacting_guard = threading.Lock()
+
+
+@contextmanager
+def _locked(session_id: str) -> Iterator[None]:
+    with _locks_guard:
+        lock = _locks.setdefault(session_id, threading.Lock())
+    with lock, FileLock(_session_path(session_id).with_suffix(".lock")):
+        yield
+
+
+def load_session(session_id: str) -> ChatSession:
+    path = _session_path(session_id)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    return ChatSession.model_validate_json(path.read_text(encoding="utf-8"))
+
+
+def save_session(session: ChatSession) -> None:
+    path = _session_path(session.id)
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(session.model_dump_json(indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+def create_session() -> ChatSession:
+    now = datetime.utcnow()
+    session = ChatSession(id=uuid.uuid4().hex, created_at=now, updated_at=now)
+    save_session(session)
+    return session
+
+
+def delete_session(session_id: str) -> None:
+    with _locked(session_id):
+        _session_path(session_id).unlink(missing_ok=True)
+    _session_path(session_id).with_suffix(".lock").unlink(missing_ok=True)
+
+
+def reusable_chunk_ids(session: ChatSession) -> list[str] | None:
+    """Chunks the next answer may reuse; ``None`` once reuse has run for
+    ``chat_max_reuse_streak`` answers in a row."""
+
+    if session.reuse_streak >= settings.chat_max_reuse_streak:
+        return None
+    return session.retrieved_chunk_ids or None
+
+
+def record_exchange(session_id: str, question: str, answer: str, chunk_ids: list[str], reused: bool = False) -> None:
+    with _locked(session_id):
+        session = load_session(session_id)
+        session.turns.append(ChatTurn(role="user", content=question))
+        session.turns.append(ChatTurn(role="assistant", content=answer))
+        session.retrieved_chunk_ids = chunk_ids
+        session.reuse_streak = session.reuse_streak + 1 if reused else 0
+        session.updated_at = datetime.utcnow()
+        save_session(session)
+
+
+def compact_session(engine: "LocalRAGEngine", session_id: str) -> None:
+    """Fold all but the most recent turns into the session summary once
+    enough unsummarized turns have piled up. Runs after the response is sent.
+
+    The summary is generated without holding the session lock, so follow-up
+    questions are not held up by the LLM call; it is applied only if no
+    other compaction changed the session in the meantime.
+    """
+
+    with _compacting_guard:
+        if session_id in _compacting:
+            return
+        _compacting.add(session_id)
+    try:
+        with _locked(session_id):
+            session = load_session(session_id)
+            if len(session.turns) <= settings.chat_compact_after:
+                return
+            old = session.turns[:-settings.chat_recent_turns]
+            summary, summarized_turns = session.summary, session.summarized_turns
+
+        new_summary = engine.summarize(summary, [t.model_dump() for t in old])
+
+        with _locked(session_id):
+            try:
+                session = load_session(session_id)
+            except HTTPException:
+                return  # deleted meanwhile
+            if session.summarized_turns != summarized_turns or session.turns[:len(old)] != old:
+                return
+            session.summary = new_summary
+            session.turns = session.turns[len(old):]
+            session.summarized_turns += len(old)
+            session.updated_at = datetime.utcnow()
+            save_session(session)
+    finally:
+        with _compacting_guard:
+            _compacting.discard(session_id)
@@ -1,11 +1,38 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
-from pathlib import Path
 from typing import Dict, Optional, List
 
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 
+from .debug_capture import capture_page, should_capture
+from .metrics import observe
+
+
+SEARCH_URL = "https://coraweb.sos.la.gov/CommercialSearch/CommercialSearch.aspx"
+ENTITY_INPUT = "#MainContent_txtEntityName"
+SEARCH_BUTTON = "#MainContent_btnSearch"
+
+# Elements that identify which page a search landed on.
+RESULTS_GRID = "#MainContent_gvSearchResults"
+DETAIL_MARKER = "#MainContent_lblAgentName"
+NO_RESULTS_MARKER = "#MainContent_lblNoRecords"
+
+_READ_FIELDS_JS = """
+() => {
+  const text = (id) => {
+    const el = document.getElementById(id);
+    return el ? el.innerText.trim() : null;
+  };
+  const rows = document.querySelectorAll("#MainContent_gvOfficers tr");
+  return {
+    agent_name: text("MainContent_lblAgentName"),
+    agent_address: text("MainContent_lblAgentAddress"),
+    officers: Array.from(rows, (row) => row.innerText.trim()).filter(Boolean),
+  };
+}
+"""
 
 @dataclass
 class SosResult:
@@ -17,94 +44,102 @@ class SosResult:
     notes: Optional[str] = None
 
 
-def run_sos_lookup(entity_name: str) -> Dict[str, object]:
+def run_sos_lookup(entity_name: str, run_id: Optional[str] = None) -> Dict[str, object]:
     """Playwright-based scaffold for Louisiana SOS lookup.
 
     Current behavior:
     - Launch Chromium using Playwright.
     - Open https://coraweb.sos.la.gov/CommercialSearch/CommercialSearch.aspx.
-    - Fill the Entity Name search box and click Search.
+    - Fill the Entity Name search box, click Search and wait for the results
+      grid, a detail page or the no-results message, stopping early when
+      nothing matched.
     - Click the first entity in the results grid if possible.
-    - Scrape registered agent, agent address, officers, and status using the
-      provided selectors.
-    - Capture a screenshot and HTML under ~/.local_rag_store/sos_debug.
+    - Read registered agent, agent address and officers in a single DOM
+      evaluation.
+    - Record per-phase timings (ms) under ``timings_ms``.
+    - Depending on ``settings.debug_capture_mode``, queue a screenshot and
+      gzipped HTML under ~/.local_rag_store/sos_debug.
     """
 
-    debug_dir = Path.home() / ".local_rag_store" / "sos_debug"
-    debug_dir.mkdir(parents=True, exist_ok=True)
 
     status: Optional[str] = None
     agent_name: Optional[str] = None
     agent_address: Optional[str] = None
     officers: List[str] = []
+    artifacts: List[str] = []
+    outcome = "error"
+    timings: Dict[str, int] = {}
+    phase_start = time.perf_counter()
+
+    def _mark(phase: str) -> None:
+        nonlocal phase_start
+        now = time.perf_counter()
+        timings[phase] = int((now - phase_start) * 1000)
+        observe(phase, now - phase_start, component="sos")
+        phase_start = now
 
     try:
         with sync_playwright() as p:
             browser = p.chromium.launch(headless=False)
             context = browser.new_context()
             page = context.new_page()
+            _mark("launch")
 
-            search_url = "https://coraweb.sos.la.gov/CommercialSearch/CommercialSearch.aspx"
-            page.goto(search_url, wait_until="load", timeout=60000)
+            page.goto(SEARCH_URL, wait_until="domcontentloaded", timeout=60000)
+            _mark("navigate")
 
-            # Fill entity name and search
+            # Fill entity name, search, and wait for the results grid, a
+            # detail page (single match) or the "no records" message.
             try:
-                page.fill("#MainContent_txtEntityName", entity_name)
-                page.click("#MainContent_btnSearch")
+                page.fill(ENTITY_INPUT, entity_name, timeout=10000)
+                page.click(SEARCH_BUTTON)
+                page.wait_for_selector(
+                    ", ".join([DETAIL_MARKER, RESULTS_GRID, NO_RESULTS_MARKER]),
+                    state="attached",
+                    timeout=20000,
+                )
+                if page.locator(DETAIL_MARKER).count():
+                    outcome = "detail"
+                elif page.locator(RESULTS_GRID).count():
+                    outcome = "results_list"
+                else:
+                    outcome = "no_results"
             except PlaywrightTimeoutError:
-                pass
+                outcome = "timeout"
             except Exception:
-                pass
-
-            # Give results time to appear
-            try:
-                page.wait_for_timeout(3000)
-            except Exception:
-                pass
-
-            # Try to click the first result link in the results grid, if present
-            try:
-                first_link = page.locator("#MainContent_gvSearchResults a").first
-                first_link().click(timeout=5000)
-                page.wait_for_timeout(2000)
-            except PlaywrightTimeoutError:
-                pass
-            except Exception:
-                pass
-
-            # Scrape registered agent and address
-            try:
-                agent_name = page.locator("#MainContent_lblAgentName").inner_text(timeout=3000)
-            except PlaywrightTimeoutError:
-                agent_name = None
-            except Exception:
-                agent_name = None
-
-            try:
-                agent_address = page.locator("#MainContent_lblAgentAddress").inner_text(timeout=3000)
-            except PlaywrightTimeoutError:
-                agent_address = None
-            except Exception:
-                agent_address = None
-
-            # Officers table
-            try:
-                officers = page.locator("#MainContent_gvOfficers tr").all_inner_texts()
-            except PlaywrightTimeoutError:
-                officers = []
-            except Exception:
-                officers = []
-
-            # Capture screenshot + HTML
-            safe_name = "_".join(entity_name.split())[:40]
-            screenshot_path = debug_dir / f"sos_{safe_name}.png"
-            html_path = debug_dir / f"sos_{safe_name}.html"
-
-            try:
-                page.screenshot(path=str(screenshot_path), full_page=True)
-                html_path.write_text(page.content(), encoding="utf-8")
-            except Exception:
-                pass
+                outcome = "error"
+            _mark("search")
+
+            # Open the first entity in the results grid and wait for its
+            # detail page rather than sleeping.
+            if outcome == "results_list":
+                try:
+                    first_link = page.locator(f"{RESULTS_GRID} a").first
+                    first_link.click(timeout=5000)
+                    page.wait_for_selector(DETAIL_MARKER, state="attached", timeout=15000)
+                    outcome = "detail"
+                except PlaywrightTimeoutError:
+                    pass
+                except Exception:
+                    pass
+                _mark("open_detail")
+
+            # Read agent, address and officers in a single DOM round-trip.
+            if outcome == "detail":
+                try:
+                    fields = page.evaluate(_READ_FIELDS_JS)
+                except Exception:
+                    fields = {}
+                agent_name = fields.get("agent_name")
+                agent_address = fields.get("agent_address")
+                officers = fields.get("officers") or []
+                _mark("extract")
+
+            # Debug artifacts are written by a background worker; by default
+            # only failed lookups are captured.
+            if should_capture(outcome == "detail" and bool(agent_name)):
+                artifacts = capture_page(page, "sos", entity_name, run_id=run_id)
+                _mark("debug_capture")
 
             browser.close()
     except Exception:
@@ -112,7 +147,9 @@ def run_sos_lookup(entity_name: str) -> Dict[str, object]:
         # scrape (possibly empty) together with notes.
         pass
 
-    base_notes = "SOS automation ran. Screenshot and HTML saved for analysis."
+    base_notes = f"SOS automation ran ({outcome.replace('_', ' ')})."
+    if artifacts:
+        base_notes += " Screenshot and HTML saved for analysis."
 
     result = SosResult(
         entity_name=entity_name,
@@ -130,4 +167,7 @@ def run_sos_lookup(entity_name: str) -> Dict[str, object]:
         "registered_office_address": result.registered_office_address or "",
         "officers": result.officers or [],
         "notes": result.notes or "",
+        "outcome": outcome,
+        "timings_ms": timings,
+        "debug_artifacts": artifacts,
     }
@@ -8,10 +8,13 @@ REM   - Open the backend\ folder and double-click start-backend.bat.
 REM Requirements on the machine:
 REM   - Python 3 installed with the "py" launcher on PATH.
 REM This script:
-REM   - Works entirely from the backend/ folder (no venv).
-REM   - Installs backend/requirements.txt into the user site-packages.
-REM   - Installs Playwright browsers.
-REM   - Starts uvicorn main:app on http://localhost:8000
+REM   - Installs from the backend/ folder, then runs the server from the
+REM     project root, since backend is imported as a package (no venv).
+REM   - Installs backend/requirements.txt into the user site-packages and the
+REM     Playwright browsers, but only when requirements.txt has changed since
+REM     the last successful install.
+REM   - Starts uvicorn backend.main:app on http://localhost:8000, with
+REM     RAG_WORKERS worker processes (default 1).
 REM ---------------------------------------------------------------------------
 
 cd /d "%~dp0"
@@ -37,6 +40,11 @@ if not exist requirements.txt (
     exit /b 1
 )
 
+REM Skip the (slow) install steps when requirements.txt is unchanged since the
+REM last successful install.
+fc /b requirements.txt .requirements.installed >nul 2>&1
+if not errorlevel 1 goto start_server
+
 echo.
 echo Installing backend dependencies to your user Python environment (this may take a few minutes)...
 py -m pip install --user --upgrade pip
@@ -53,13 +61,20 @@ echo.
 echo Ensuring Playwright browsers are installed (this may run only the first time)...
 py -m playwright install
 
+copy /y requirements.txt .requirements.installed >nul
+
+:start_server
 echo.
 echo Backend is starting on http://localhost:8000
 echo Leave this window open while you use the web interface.
 echo Press CTRL+C to stop the server.
 echo.
 
-py -m uvicorn main:app --host 0.0.0.0 --port 8000 --reload
+if "%RAG_WORKERS%"=="" set RAG_WORKERS=1
+
+REM The backend is a package (relative imports), so run it from the project root.
+cd ..
+py -m uvicorn backend.main:app --host 0.0.0.0 --port 8000 --workers %RAG_WORKERS%
 
 echo.
 echo Backend process has exited. Press any key to close this window.
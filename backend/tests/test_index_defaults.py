@@ -0,0 +1,38 @@
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+pytest.importorskip("chromadb")
+from fastapi.testclient import TestClient
+
+from backend import runtime
+from backend.bench.stub_openai import StubOpenAIServer
+from backend.config import settings
+from backend.main import app
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    with StubOpenAIServer(dim=64) as stub:
+        monkeypatch.setattr(settings, "storage_dir", tmp_path / "store")
+        monkeypatch.setattr(settings, "openai_base_url", stub.base_url)
+        yield TestClient(app)
+    runtime.shutdown()
+
+
+def test_default_index_picks_up_xlsx(client, tmp_path):
+    root = tmp_path / "share"
+    root.mkdir()
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Item", "Cost"])
+    sheet.append(["Concrete slab", 12500])
+    workbook.save(root / "estimate.xlsx")
+
+    assert client.post("/config", json={"root_paths": [str(root)], "openai_api_key": "test"}).status_code == 200
+    # Same body the frontend sends: no globs, so the defaults apply.
+    resp = client.post("/index", json={"full_rebuild": True})
+    assert resp.status_code == 200
+    assert resp.json()["indexed_files"] == 1
+
+    engine, _ = runtime.get_engine()
+    assert engine.indexed_sources(root) == [(root / "estimate.xlsx").resolve()]
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import os
+import threading
+import time
 from pathlib import Path
+from typing import Iterable, Iterator
 
 
 def is_probably_text(path: Path, blocksize: int = 1024) -> bool:
@@ -34,3 +38,76 @@ def chunk_text(text: str, max_chars: int = 1200, overlap: int = 200) -> list[str
             break
         start = max(0, end - overlap)
     return chunks
+
+
+def iter_chunks(pieces: Iterable[str], max_chars: int = 1200, overlap: int = 200) -> Iterator[str]:
+    """Streaming ``chunk_text``: yields the same chunks for the concatenation
+    of ``pieces`` without building the full string."""
+
+    if max_chars <= 0:
+        yield "".join(pieces)
+        return
+
+    buf = ""
+    for piece in pieces:
+        buf += piece
+        # More text follows, so this chunk is not the last one.
+        while len(buf) > max_chars:
+            yield buf[:max_chars]
+            buf = buf[max(0, max_chars - overlap):]
+    if buf:
+        yield buf
+
+
+class FileLock:
+    """Cross-process lock based on exclusive creation of a lock file.
+
+    Works the same on Windows and POSIX. A lock file older than
+    ``stale_after`` seconds is assumed to belong to a crashed process; with
+    ``keep_alive`` the holder touches the file in the background so locks held
+    for longer than that (e.g. a full index rebuild) are not taken over.
+    """
+
+    def __init__(self, path: Path, timeout: float = 10.0, stale_after: float = 30.0, keep_alive: bool = False) -> None:
+        self.path = path
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.keep_alive = keep_alive
+        self._released = threading.Event()
+        self._heartbeat: threading.Thread | None = None
+
+    def __enter__(self) -> "FileLock":
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fd = os.open(str(self.path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                if self.keep_alive:
+                    self._released.clear()
+                    self._heartbeat = threading.Thread(target=self._touch_loop, name="file-lock-heartbeat", daemon=True)
+                    self._heartbeat.start()
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - self.path.stat().st_mtime > self.stale_after:
+                        self.path.unlink(missing_ok=True)
+                        continue
+                except OSError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Could not acquire lock {self.path}")
+                time.sleep(0.05)
+
+    def __exit__(self, *exc) -> None:
+        if self._heartbeat is not None:
+            self._released.set()
+            self._heartbeat.join()
+            self._heartbeat = None
+        self.path.unlink(missing_ok=True)
+
+    def _touch_loop(self) -> None:
+        while not self._released.wait(self.stale_after / 3):
+            try:
+                os.utime(self.path)
+            except OSError:
+                pass
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+
+PRECISIONS = ("float32", "float16", "int8")
+
+
+def truncate_vectors(vectors: Sequence[Sequence[float]], dims: int) -> List[List[float]]:
+    """Shorten embeddings to their first ``dims`` components and renormalize.
+
+    For Matryoshka-trained models such as text-embedding-3 this matches what
+    the API returns for the ``dimensions`` parameter.
+    """
+
+    arr = np.asarray(vectors, dtype=np.float32)[:, :dims]
+    norms = np.linalg.norm(arr, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (arr / norms).tolist()
+
+
+class RescoreVectorStore:
+    """Full-dimension vectors kept beside the Chroma collection for rescoring.
+
+    The ANN index only holds shortened vectors; the final candidates are
+    re-ranked against these, stored compactly as float16 or int8 (symmetric,
+    per-vector scale) in SQLite.
+    """
+
+    def __init__(self, path: Path, precision: str = "int8") -> None:
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown rescore precision: {precision}")
+        self.precision = precision
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors ("
+            " id TEXT PRIMARY KEY, source_path TEXT, scale REAL, data BLOB)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS vectors_source ON vectors(source_path)")
+        self._conn.commit()
+
+    def _encode(self, vec: np.ndarray) -> tuple[float, bytes]:
+        if self.precision == "int8":
+            scale = float(np.abs(vec).max()) / 127 or 1.0
+            return scale, np.round(vec / scale).astype(np.int8).tobytes()
+        if self.precision == "float16":
+            return 1.0, vec.astype(np.float16).tobytes()
+        return 1.0, vec.astype(np.float32).tobytes()
+
+    def _decode(self, scale: float, data: bytes) -> np.ndarray:
+        dtype = {"int8": np.int8, "float16": np.float16, "float32": np.float32}[self.precision]
+        return np.frombuffer(data, dtype=dtype).astype(np.float32) * scale
+
+    def upsert(self, ids: List[str], source_paths: List[str], vectors: Sequence[Sequence[float]]) -> None:
+        arr = np.asarray(vectors, dtype=np.float32)
+        rows = []
+        for chunk_id, source_path, vec in zip(ids, source_paths, arr):
+            scale, data = self._encode(vec)
+            rows.append((chunk_id, source_path, scale, data))
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO vectors VALUES (?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def delete_source(self, source_path: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM vectors WHERE source_path = ?", (source_path,))
+            self._conn.commit()
+
+    def get(self, ids: List[str]) -> Dict[str, np.ndarray]:
+        if not ids:
+            return {}
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, scale, data FROM vectors WHERE id IN ({placeholders})", ids
+            ).fetchall()
+        return {chunk_id: self._decode(scale, data) for chunk_id, scale, data in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .config import settings
+from .rag import LocalRAGEngine
+
+try:  # inotify / FSEvents / ReadDirectoryChangesW when available
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - polling fallback
+    FileSystemEventHandler = object  # type: ignore[assignment,misc]
+    Observer = None  # type: ignore[assignment]
+
+
+logger = logging.getLogger(__name__)
+
+
+class _EventHandler(FileSystemEventHandler):  # type: ignore[misc]
+    def __init__(self, watcher: "IndexWatcher") -> None:
+        self._watcher = watcher
+
+    def on_any_event(self, event) -> None:
+        if event.is_directory:
+            # A directory removed or moved away may arrive as this single
+            # event, without one per file inside it.
+            if event.event_type in ("deleted", "moved"):
+                self._watcher.record_tree(Path(event.src_path), removed=True)
+            if event.event_type == "moved":
+                self._watcher.record_tree(Path(event.dest_path), removed=False)
+            return
+        if event.event_type in ("created", "modified", "closed"):
+            self._watcher.record(Path(event.src_path), removed=False)
+        elif event.event_type == "deleted":
+            self._watcher.record(Path(event.src_path), removed=True)
+        elif event.event_type == "moved":
+            self._watcher.record(Path(event.src_path), removed=True)
+            self._watcher.record(Path(event.dest_path), removed=False)
+
+
+class IndexWatcher:
+    """Keep the index in sync with the configured root folders.
+
+    File events (from watchdog, or from periodic mtime scans when watchdog is
+    not installed) are collected per path, coalesced, and flushed to
+    ``LocalRAGEngine.update_files`` once the folders have been quiet for
+    ``debounce_seconds``. Only the affected files are re-ingested.
+    """
+
+    def __init__(
+        self,
+        engine: LocalRAGEngine,
+        root_paths: List[Path],
+        include_globs: Optional[List[str]] = None,
+        exclude_globs: Optional[List[str]] = None,
+        debounce_seconds: Optional[float] = None,
+        poll_interval_seconds: Optional[float] = None,
+    ) -> None:
+        self.engine = engine
+        self.root_paths = root_paths
+        self.include_globs = include_globs or settings.default_include_globs
+        self.exclude_globs = exclude_globs or settings.default_exclude_globs
+        self.debounce_seconds = debounce_seconds if debounce_seconds is not None else settings.watch_debounce_seconds
+        self.poll_interval_seconds = poll_interval_seconds if poll_interval_seconds is not None else settings.watch_poll_interval_seconds
+
+        # path -> True if the latest event removed it, False if it changed.
+        self._pending: Dict[Path, bool] = {}
+        self._last_event = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._observer = None
+        self._snapshot: Dict[Path, Tuple[float, int]] = {}
+
+        self.mode = "inotify" if Observer is not None else "polling"
+        self.stats = {"flushes": 0, "files_updated": 0, "files_removed": 0, "chunks_written": 0, "last_flush_at": None}
+
+    def record(self, path: Path, removed: bool) -> None:
+        if not self.engine.matches_globs(path, self.include_globs, self.exclude_globs):
+            return
+        with self._lock:
+            self._pending[path] = removed
+            self._last_event = time.monotonic()
+
+    def record_tree(self, directory: Path, removed: bool) -> None:
+        """Record every file under ``directory``: the ones the index holds
+        when it was removed, the ones on disk when it changed."""
+
+        try:
+            if removed:
+                paths = self.engine.indexed_sources(directory)
+            else:
+                paths = list(self.engine._iter_files([directory], self.include_globs, self.exclude_globs))
+        except Exception:
+            logger.exception("Could not expand directory event for %s", directory)
+            return
+        for path in paths:
+            self.record(path, removed=removed)
+
+    def start(self) -> None:
+        if Observer is not None:
+            self._observer = Observer()
+            handler = _EventHandler(self)
+            for root in self.root_paths:
+                self._observer.schedule(handler, str(root), recursive=True)
+            self._observer.start()
+        else:
+            self._snapshot = self._scan()
+            self._threads.append(threading.Thread(target=self._poll_loop, name="index-watch-poll", daemon=True))
+
+        self._threads.append(threading.Thread(target=self._flush_loop, name="index-watch-flush", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def status(self) -> dict:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "mode": self.mode,
+            "root_paths": [str(p) for p in self.root_paths],
+            "pending": pending,
+            **self.stats,
+        }
+
+    def _scan(self) -> Dict[Path, Tuple[float, int]]:
+        snapshot: Dict[Path, Tuple[float, int]] = {}
+        for path in self.engine._iter_files(self.root_paths, self.include_globs, self.exclude_globs):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime, stat.st_size)
+        return snapshot
+
+    def _poll_loop(self) -> None:
+        while not self._stop.wait(self.poll_interval_seconds):
+            current = self._scan()
+            for path, sig in current.items():
+                if self._snapshot.get(path) != sig:
+                    self.record(path, removed=False)
+            for path in self._snapshot.keys() - current.keys():
+                self.record(path, removed=True)
+            self._snapshot = current
+
+    def _flush_loop(self) -> None:
+        tick = min(0.5, self.debounce_seconds)
+        while not self._stop.wait(tick):
+            with self._lock:
+                if not self._pending or time.monotonic() - self._last_event < self.debounce_seconds:
+                    continue
+                batch, self._pending = self._pending, {}
+
+            changed = [p for p, removed in batch.items() if not removed]
+            removed = [p for p, removed in batch.items() if removed]
+            try:
+                chunks = self.engine.update_files(changed, removed)
+            except Exception:
+                logger.exception("Incremental index update failed; requeueing %d paths", len(batch))
+                with self._lock:
+                    for path, was_removed in batch.items():
+                        self._pending.setdefault(path, was_removed)
+                    self._last_event = time.monotonic()
+                continue
+
+            self.stats["flushes"] += 1
+            self.stats["files_updated"] += len(changed)
+            self.stats["files_removed"] += len(removed)
+            self.stats["chunks_written"] += chunks
+            self.stats["last_flush_at"] = time.time()
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import logging
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Iterator
 
 from fastapi import APIRouter, HTTPException
 
@@ -13,10 +16,14 @@ from .models import (
     SiteCredential,
     CredentialUpdateRequest,
 )
-from .beacon_agent import run_beacon_lookup
-from .sos_agent import run_sos_lookup
+from .lookup_cache import get_cached, put_cached
+from .credential_store import credential_store
+from .metrics import timed
+from .utils import FileLock
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/workflow", tags=["workflow"])
 
 
@@ -26,31 +33,6 @@ def _workflow_dir() -> Path:
     return base
 
 
-def _credentials_path() -> Path:
-    base = Path.home() / ".local_rag_store"
-    base.mkdir(parents=True, exist_ok=True)
-    return base / "credentials.json"
-
-
-def _load_credentials() -> Dict[str, Dict[str, str]]:
-    path = _credentials_path()
-    if not path.exists():
-        return {}
-    try:
-        import json
-
-        return json.loads(path.read_text(encoding="utf-8"))
-    except Exception:
-        return {}
-
-
-def _save_credentials(data: Dict[str, Dict[str, str]]) -> None:
-    import json
-
-    path = _credentials_path()
-    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
-
-
 def _workflow_path(run_id: str) -> Path:
     return _workflow_dir() / f"{run_id}.json"
 
@@ -65,7 +47,45 @@ def _load_run(run_id: str) -> WorkflowRun:
 
 def _save_run(run: WorkflowRun) -> None:
     path = _workflow_path(run.id)
-    path.write_text(run.model_dump_json(indent=2), encoding="utf-8")
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(run.model_dump_json(indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+_run_locks: Dict[str, threading.Lock] = {}
+_run_locks_guard = threading.Lock()
+
+
+@contextmanager
+def _locked_run(run_id: str) -> Iterator[None]:
+    """Serialize load -> mutate -> save cycles on one run, across threads and
+    across backend processes."""
+
+    with _run_locks_guard:
+        lock = _run_locks.setdefault(run_id, threading.Lock())
+    with lock, FileLock(_workflow_path(run_id).with_suffix(".lock")):
+        yield
+
+
+def _commit_step(run_id: str, step_id: str, data: dict, replace: bool = False) -> WorkflowRun:
+    """Apply a change to a single step on the latest stored version of a run.
+
+    The run is re-read under the run lock, so results from steps that finished
+    concurrently are merged rather than overwritten.
+    """
+
+    with _locked_run(run_id):
+        run = _load_run(run_id)
+        for step in run.steps:
+            if step.step_id == step_id:
+                step.data = data if replace else {**(step.data or {}), **data}
+                break
+        else:
+            run.steps.append(WorkflowStepData(step_id=step_id, data=data))
+        run.version += 1
+        run.updated_at = datetime.utcnow()
+        _save_run(run)
+    return run
 
 
 @router.get("/runs", response_model=List[WorkflowRun])
@@ -111,129 +131,97 @@ async def create_run(req: WorkflowCreateRequest) -> WorkflowRun:
 
 
 @router.post("/credentials/{site}", response_model=SiteCredential)
-async def set_credentials(site: str, req: CredentialUpdateRequest) -> SiteCredential:
-    existing = _load_credentials()
-    existing[site] = {"username": req.username, "password": req.password}
-    _save_credentials(existing)
+def set_credentials(site: str, req: CredentialUpdateRequest) -> SiteCredential:
+    credential_store.set(site, req.username, req.password)
     return SiteCredential(site=site, username=req.username, password=req.password)
 
 
+def _try_put_cached(source: str, key: str, data: dict) -> None:
+    # A failed cache write must not cost the scrape result.
+    try:
+        put_cached(source, key, data)
+    except Exception:
+        logger.exception("Could not cache %s lookup", source)
+
+
 def _get_site_credentials(site: str) -> Dict[str, str] | None:
-    return _load_credentials().get(site)
+    return credential_store.get(site)
 
 
 @router.post("/runs/{run_id}/run_step/{step_id}", response_model=WorkflowRun)
-async def run_step(run_id: str, step_id: str) -> WorkflowRun:
+def run_step(run_id: str, step_id: str, force_refresh: bool = False) -> WorkflowRun:
     """Execute an automated step for a workflow run.
 
-    Currently only supports a stubbed implementation for the 'beacon_tax' step,
-    which fills in placeholder data. Later this will call real Playwright-based
-    automation to navigate the Beacon / tax assessor site.
+    Beacon and SOS lookups are served from the lookup cache when a fresh entry
+    exists for the same address / entity; pass ``force_refresh=true`` to
+    re-scrape the live site regardless.
+
+    This is a plain ``def`` so FastAPI runs it in its threadpool and several
+    steps can execute in parallel; only the final step write is serialized.
     """
 
     run = _load_run(run_id)
 
     if step_id == "beacon_tax":
-        creds = _get_site_credentials("beacon")
-        data = run_beacon_lookup(
-            property_label=run.label,
-            address=run.address,
-            username=(creds or {}).get("username"),
-            password=(creds or {}).get("password"),
-        )
-        # merge into existing step data
-        found = False
-        for step in run.steps:
-            if step.step_id == step_id:
-                step.data = {**(step.data or {}), **data}
-                found = True
-                break
-        if not found:
-            run.steps.append(WorkflowStepData(step_id=step_id, data=data))
-        run.updated_at = datetime.utcnow()
-        _save_run(run)
-        return run
+        lookup_key = run.address or run.label
+        data = None if force_refresh else get_cached("beacon", lookup_key)
+        if data is None:
+            # Playwright is only imported once a lookup actually runs.
+            from .beacon_agent import run_beacon_lookup
+
+            creds = _get_site_credentials("beacon")
+            with timed("beacon_lookup", component="workflow"):
+                data = run_beacon_lookup(
+                    property_label=run.label,
+                    address=run.address,
+                    username=(creds or {}).get("username"),
+                    password=(creds or {}).get("password"),
+                    run_id=run.id,
+                )
+            # Only cache lookups that actually found something.
+            if data.get("owner") or data.get("parcel_id"):
+                _try_put_cached("beacon", lookup_key, data)
+            data = {**data, "cached": False}
+        return _commit_step(run_id, step_id, data)
 
     if step_id == "usgs_flood":
         data = {
             "notes": "USGS flood data automation stub ran. Integrate webapps.usgs.gov selectors here to pull flood zone and risk details.",
         }
-        found = False
-        for step in run.steps:
-            if step.step_id == step_id:
-                step.data = {**(step.data or {}), **data}
-                found = True
-                break
-        if not found:
-            run.steps.append(WorkflowStepData(step_id=step_id, data=data))
-        run.updated_at = datetime.utcnow()
-        _save_run(run)
-        return run
+        return _commit_step(run_id, step_id, data)
 
     if step_id == "google_search":
         data = {
             "notes": "Google/web search automation stub ran. Future version will gather links, news, zoning issues, and nearby projects.",
         }
-        found = False
-        for step in run.steps:
-            if step.step_id == step_id:
-                step.data = {**(step.data or {}), **data}
-                found = True
-                break
-        if not found:
-            run.steps.append(WorkflowStepData(step_id=step_id, data=data))
-        run.updated_at = datetime.utcnow()
-        _save_run(run)
-        return run
+        return _commit_step(run_id, step_id, data)
 
     if step_id == "owner_intel":
         data = {
             "notes": "Owner intel automation stub ran. Future version will search social/professional profiles and other properties tied to this entity.",
         }
-        found = False
-        for step in run.steps:
-            if step.step_id == step_id:
-                step.data = {**(step.data or {}), **data}
-                found = True
-                break
-        if not found:
-            run.steps.append(WorkflowStepData(step_id=step_id, data=data))
-        run.updated_at = datetime.utcnow()
-        _save_run(run)
-        return run
+        return _commit_step(run_id, step_id, data)
 
     if step_id == "proposal":
         data = {
             "notes": "Proposal automation stub ran. Future version will assemble a draft proposal using data from all previous steps.",
         }
-        found = False
-        for step in run.steps:
-            if step.step_id == step_id:
-                step.data = {**(step.data or {}), **data}
-                found = True
-                break
-        if not found:
-            run.steps.append(WorkflowStepData(step_id=step_id, data=data))
-        run.updated_at = datetime.utcnow()
-        _save_run(run)
-        return run
+        return _commit_step(run_id, step_id, data)
 
     if step_id == "secretary_of_state":
         # Use the investigation label as the default entity name; later we can
         # allow overriding this per-run.
         entity_name = run.label
-        data = run_sos_lookup(entity_name=entity_name)
-        found = False
-        for step in run.steps:
-            if step.step_id == step_id:
-                step.data = {**(step.data or {}), **data}
-                found = True
-                break
-        if not found:
-            run.steps.append(WorkflowStepData(step_id=step_id, data=data))
-        run.updated_at = datetime.utcnow()
-        _save_run(run)
-        return run
+        data = None if force_refresh else get_cached("sos", entity_name)
+        if data is None:
+            from .sos_agent import run_sos_lookup
+
+            with timed("sos_lookup", component="workflow"):
+                data = run_sos_lookup(entity_name=entity_name, run_id=run.id)
+            if data.get("registered_agent") or data.get("officers"):
+                _try_put_cached("sos", entity_name, data)
+            data = {**data, "cached": False}
+        return _commit_step(run_id, step_id, data)
 
     raise HTTPException(status_code=400, detail=f"Unsupported automated step: {step_id}")
 
@@ -244,26 +232,32 @@ async def get_run(run_id: str) -> WorkflowRun:
 
 
 @router.put("/runs/{run_id}", response_model=WorkflowRun)
-async def update_run(run_id: str, run_update: WorkflowRun) -> WorkflowRun:
+def update_run(run_id: str, run_update: WorkflowRun) -> WorkflowRun:
+    """Replace a whole run. ``version`` must match the stored run, otherwise
+    the client is working from a stale copy and gets a 409.
+
+    A plain ``def``: the run lock may wait on another process, which must
+    not block the event loop.
+    """
+
     if run_id != run_update.id:
         raise HTTPException(status_code=400, detail="ID in path and body must match")
-    run_update.updated_at = datetime.utcnow()
-    _save_run(run_update)
+    with _locked_run(run_id):
+        current = _load_run(run_id)
+        if run_update.version != current.version:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Run was modified concurrently (version {current.version}, got {run_update.version})",
+            )
+        run_update.version = current.version + 1
+        run_update.updated_at = datetime.utcnow()
+        _save_run(run_update)
     return run_update
 
 
 @router.put("/runs/{run_id}/steps/{step_id}", response_model=WorkflowRun)
-async def update_step(run_id: str, step_id: str, payload: dict) -> WorkflowRun:
-    run = _load_run(run_id)
-    found = False
-    for step in run.steps:
-        if step.step_id == step_id:
-            step.data = payload.get("data", step.data)
-            found = True
-            break
-    if not found:
-        # Optionally add the step if not present
-        run.steps.append(WorkflowStepData(step_id=step_id, data=payload.get("data", {})))
-    run.updated_at = datetime.utcnow()
-    _save_run(run)
-    return run
+def update_step(run_id: str, step_id: str, payload: dict) -> WorkflowRun:
+    """Replace one step's data. Only that step is touched, so edits to
+    different steps never conflict. Runs in the threadpool like ``update_run``."""
+
+    return _commit_step(run_id, step_id, payload.get("data", {}), replace="data" in payload)
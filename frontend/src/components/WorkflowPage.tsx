@@ -13,6 +13,7 @@ interface WorkflowRun {
   updated_at: string;
   status: string;
   steps: WorkflowStepData[];
+  version: number;
 }
 
 interface WorkflowPageProps {